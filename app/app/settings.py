@@ -46,16 +46,26 @@ INSTALLED_APPS = [
     'recipe',
 ]
 
+# Session, auth, messages and CSRF middleware are skipped for requests
+# under API_PATH_PREFIX, see core.middleware.ApiExemptMixin
+
 MIDDLEWARE = [
+    'core.middleware.instrumentation_middleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.replica_routing_middleware',
+    'core.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.CsrfViewMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+API_PATH_PREFIX = '/api/'
+
+# Bearer token scrapers of /metrics must send, disabled if unset
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -76,21 +86,174 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# Serve the API through async views, for deployments behind app.asgi.
+# Views needing the ORM run one at a time per process, see
+# core.async_views.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# core.db.postgresql adds health checks and optional in-process pooling,
+# see its DatabaseWrapper. Behind pgbouncer in transaction mode, keep
+# DB_POOL_MAX_SIZE at 0 and let pgbouncer pool instead, and set
+# DB_DISABLE_SERVER_SIDE_CURSORS=1: the named cursors behind streamed
+# querysets (e.g. the tag export) do not survive transaction pooling.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.postgresql',
         'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', ''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS') == '1',
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS') == '1'
+        ),
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 0)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+            'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', 10)),
+        },
     }
 }
 
 
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets, see core.throttling. Rates are keyed by view scope
+    # and bucket kind, views without a rate are not throttled.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.IPThrottle',
+        'core.throttling.UserThrottle',
+        'core.throttling.RouteThrottle',
+    ],
+    # Reverse proxies in front of the app, whose X-Forwarded-For entries
+    # are trusted for client addresses. With 0 clients are told apart
+    # by REMOTE_ADDR, as they could fake the header.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': os.environ.get('THROTTLE_LOGIN_IP', '20/min'),
+        'login.route': os.environ.get('THROTTLE_LOGIN_ROUTE', '50/s'),
+        'signup.ip': os.environ.get('THROTTLE_SIGNUP_IP', '30/hour'),
+        'signup.route': os.environ.get('THROTTLE_SIGNUP_ROUTE', '10/s'),
+        'default.user': os.environ.get('THROTTLE_USER', '100/s'),
+    },
+}
+
+# Cache alias holding throttle buckets, shared by all workers. Buckets
+# are kept in process memory if unset, see core.throttling.
+THROTTLE_CACHE = os.environ.get('THROTTLE_CACHE')
+
+
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica1,replica2. Safe requests
+# read from them, see core.routers.
+
+REPLICA_DATABASES = []
+for index, host in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    alias = 'replica_%d' % index
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Seconds a client reads from primary after a write
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+
+# Whether /readyz also requires all migrations to be applied
+READINESS_CHECK_MIGRATIONS = \
+    os.environ.get('READINESS_CHECK_MIGRATIONS', '1') == '1'
+
+
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Server worker processes, read by gunicorn too. With more than one,
+# the default cache must be shared, see core.checks.
+SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+CACHES = {
+    # Must be shared between workers, as it holds the per-user versions
+    # behind ETags (core.versions) and replica pins (core.routers)
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # Rendered tag list pages, see recipe.cache
+    'tags': {
+        'BACKEND': os.environ.get(
+            'TAG_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('TAG_CACHE_LOCATION', 'tags'),
+        'TIMEOUT': int(os.environ.get('TAG_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TAG_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+TAG_LIST_CACHE = 'tags'
+
+USER_VERSION_CACHE = 'default'
+
+# Rows per INSERT of the bulk tag endpoint
+TAG_BULK_CREATE_BATCH_SIZE = int(
+    os.environ.get('TAG_BULK_CREATE_BATCH_SIZE', 500)
+)
+
+# Tags per request of the bulk create, batch rename and delete endpoints
+TAG_BATCH_MAX_SIZE = int(os.environ.get('TAG_BATCH_MAX_SIZE', 1000))
+
+# Incremental tag sync, see recipe.sync. Changes committed up to
+# SETTLE_SECONDS after their timestamp are still picked up.
+TAG_SYNC_PAGE_SIZE = int(os.environ.get('TAG_SYNC_PAGE_SIZE', 1000))
+TAG_SYNC_SETTLE_SECONDS = int(os.environ.get('TAG_SYNC_SETTLE_SECONDS', 5))
+TAG_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get('TAG_TOMBSTONE_RETENTION_DAYS', 30)
+)
+
+# Rows fetched per round trip by the streaming tag export
+TAG_EXPORT_CHUNK_SIZE = int(os.environ.get('TAG_EXPORT_CHUNK_SIZE', 2000))
+
+# Admin changelists of tables with at least this many rows show the
+# PostgreSQL row estimate instead of counting, see core.admin
+ADMIN_ESTIMATED_COUNT_MIN = int(
+    os.environ.get('ADMIN_ESTIMATED_COUNT_MIN', 100000)
+)
+
+# Token to user resolution cache, see core.authentication
+TOKEN_AUTH_CACHE_MAX_ENTRIES = int(
+    os.environ.get('TOKEN_AUTH_CACHE_MAX_ENTRIES', 10000)
+)
+TOKEN_AUTH_CACHE_TIMEOUT = int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 60))
+TOKEN_AUTH_SHARED_CACHE = os.environ.get('TOKEN_AUTH_SHARED_CACHE')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -110,6 +273,58 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashers
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+#
+# The profile picks the hasher new hashes are made with. The others stay
+# listed so existing hashes verify, and are rehashed with the profile's
+# hasher and cost on the next successful login.
+
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'core.hashers.TunablePBKDF2PasswordHasher',
+    'argon2': 'core.hashers.TunableArgon2PasswordHasher',
+}
+
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+    if profile != PASSWORD_HASHER_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 260000)
+)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400)
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8)
+)
+
+
+# Password hashing pool, see core.hashing. 0 workers hashes inline.
+# Every server worker has its own pool, so the cores are shared out
+# between them.
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get(
+        'PASSWORD_HASHING_WORKERS',
+        max(1, (os.cpu_count() or 1) // SERVER_WORKERS)
+    )
+)
+# Hashes allowed in flight per server worker before requests are shed
+# with 503
+PASSWORD_HASHING_QUEUE_LIMIT = int(
+    os.environ.get('PASSWORD_HASHING_QUEUE_LIMIT', 4 * PASSWORD_HASHING_WORKERS)
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
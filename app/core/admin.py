@@ -1,12 +1,64 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from core import models
 
 
+def estimated_count(queryset):
+    """Returns row estimate of an unfiltered queryset, None if unknown
+
+    Reads the planner statistics PostgreSQL keeps in pg_class, which
+    are refreshed by ANALYZE and autovacuum, instead of counting.
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    # Tables never analyzed report -1
+    if row is None or row[0] < 0:
+        return None
+
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator estimating the count of huge unfiltered changelists
+
+    Below ADMIN_ESTIMATED_COUNT_MIN rows, and for filtered lists, rows
+    are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and \
+                estimate >= settings.ADMIN_ESTIMATED_COUNT_MIN:
+            return estimate
+
+        return super().count
+
+
 class UserAdmin(BaseUserAdmin):
     ordering = ['id']
     list_display = ['email', 'name']
+    # Only columns backed by an index can be sorted
+    sortable_by = ['email']
+    # Prefix lookups use the email index, a pattern_ops one on PostgreSQL
+    search_fields = ['email__startswith']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('name',)}),
@@ -25,5 +77,18 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class TagAdmin(admin.ModelAdmin):
+    ordering = ['-id']
+    list_display = ['name', 'user', 'usage_count', 'updated_at']
+    list_select_related = ['user']
+    sortable_by = []
+    # Substring search uses core_tag_user_name_trgm_idx on PostgreSQL
+    search_fields = ['name']
+    autocomplete_fields = ['user']
+    readonly_fields = ['version', 'usage_count', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Tag)
+admin.site.register(models.Tag, TagAdmin)
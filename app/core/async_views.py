@@ -0,0 +1,93 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.authentication import get_authorization_header
+
+from core import authentication, versions
+from core.mixins import etag_matches
+from core.renderers import FastJSONRenderer
+
+
+def async_view(view, fast_path=None):
+    """Returns async view answering cheap requests without the ORM
+
+    fast_path is called for GET requests first and may return a
+    response built from caches alone. It runs in the default thread
+    pool, not on the event loop, since Django 3.2 caches have no async
+    API and a shared cache is a network round trip.
+
+    Anything it declines runs the sync DRF view. As Django 3.2 has no
+    async ORM and its ASGIHandler sets up no ThreadSensitiveContext,
+    these views all run on one thread per process, one at a time, so
+    scale ASGI deployments by processes rather than concurrency.
+    """
+
+    run_view = sync_to_async(view)
+    if fast_path is not None:
+        fast_path = sync_to_async(fast_path, thread_sensitive=False)
+
+    async def wrapper(request, *args, **kwargs):
+        if fast_path is not None and request.method == 'GET':
+            response = await fast_path(request, *args, **kwargs)
+            if response is not None:
+                return response
+
+        return await run_view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+
+    return wrapper
+
+
+def deployment_view(view, fast_path=None):
+    """Returns async variant of view if ASYNC_VIEWS is enabled"""
+
+    if settings.ASYNC_VIEWS:
+        return async_view(view, fast_path)
+
+    return view
+
+
+def cached_user(request):
+    """Returns user of request token if resolved before, else None"""
+
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        return None
+
+    try:
+        resolved = authentication.get_cached(auth[1].decode())
+    except UnicodeError:
+        return None
+
+    return None if resolved is None else resolved[0]
+
+
+def not_modified(request, user):
+    """Returns 304 response if client copy is current, else None"""
+
+    etag = versions.etag(user.pk, request.get_full_path())
+    if not etag_matches(request, etag):
+        return None
+
+    response = HttpResponse(status=304)
+    response['ETag'] = etag
+
+    return response
+
+
+def json_response(request, data, **headers):
+    """Returns data rendered as JSON, or None if client wants HTML"""
+
+    if 'format' in request.GET or \
+            'text/html' in request.headers.get('Accept', ''):
+        return None
+
+    response = HttpResponse(
+        FastJSONRenderer().render(data),
+        content_type='application/json'
+    )
+    for header, value in headers.items():
+        response[header] = value
+
+    return response
@@ -0,0 +1,134 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+class _LRUCache:
+    """Thread-safe, size-bounded mapping with per-entry expiry"""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, max_entries):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local_cache = _LRUCache()
+
+
+def _shared_cache():
+    alias = settings.TOKEN_AUTH_SHARED_CACHE
+    return caches[alias] if alias else None
+
+
+def _shared_key(key):
+    return 'auth:token:%s' % key
+
+
+def invalidate(*keys):
+    """Drops cached resolution of given token keys"""
+
+    shared = _shared_cache()
+    for key in keys:
+        _local_cache.delete(key)
+        if shared is not None:
+            shared.delete(_shared_key(key))
+
+
+def get_cached(key):
+    """Returns (user, token) for key from in-process cache, if there
+
+    Never touches the database or a shared cache, so it is safe to
+    call from async code.
+    """
+
+    resolved = _local_cache.get(key)
+
+    return None if resolved is None else _copy(resolved)
+
+
+def _copy(resolved):
+    """Returns copies of cached (user, token), as callers may modify them"""
+
+    user, token = copy.copy(resolved[0]), copy.copy(resolved[1])
+    token.user = user
+
+    return user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching token to user resolution
+
+    Resolved tokens are kept in a bounded in-process LRU and, if
+    TOKEN_AUTH_SHARED_CACHE names a cache, in that cache as well.
+    Entries are dropped by core.signals when the token is deleted or
+    its user is saved, which covers rotation and deactivation. Other
+    processes only see the change once their local entry expires, so
+    TOKEN_AUTH_CACHE_TIMEOUT bounds how long a revoked token lives.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = get_cached(key)
+        if cached is not None:
+            return cached
+
+        resolved = None
+        shared = _shared_cache()
+        if shared is not None:
+            resolved = shared.get(_shared_key(key))
+            if resolved is not None:
+                self._store_local(key, resolved)
+
+        if resolved is None:
+            # Rejects unknown tokens and inactive users
+            resolved = super().authenticate_credentials(key)
+            self._store_local(key, resolved)
+            if shared is not None:
+                shared.set(
+                    _shared_key(key),
+                    resolved,
+                    settings.TOKEN_AUTH_CACHE_TIMEOUT
+                )
+
+        return _copy(resolved)
+
+    @staticmethod
+    def _store_local(key, resolved):
+        _local_cache.set(
+            key,
+            resolved,
+            settings.TOKEN_AUTH_CACHE_TIMEOUT,
+            settings.TOKEN_AUTH_CACHE_MAX_ENTRIES
+        )
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_version_cache(app_configs, **kwargs):
+    """Fails when several workers would each keep their own versions
+
+    core.versions and the replica pins of core.routers are only seen
+    by other workers through a cache they share, otherwise a worker
+    answers 304 for data another worker changed.
+    """
+
+    backend = settings.CACHES[settings.USER_VERSION_CACHE]['BACKEND']
+    if settings.SERVER_WORKERS <= 1 or backend not in PROCESS_LOCAL_CACHES:
+        return []
+
+    return [Error(
+        'USER_VERSION_CACHE %r uses the process-local %s with %d '
+        'workers.' % (
+            settings.USER_VERSION_CACHE, backend, settings.SERVER_WORKERS),
+        hint='Set CACHE_BACKEND and CACHE_LOCATION to a cache shared by '
+             'all workers, such as memcached or Redis.',
+        id='core.E001',
+    )]
+
+
+@register()
+def check_argon2_installed(app_configs, **kwargs):
+    """Fails when the argon2 profile is picked without argon2-cffi
+
+    Otherwise every signup and login fails when hashing.
+    """
+
+    if settings.PASSWORD_HASHER_PROFILE != 'argon2':
+        return []
+
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        return [Error(
+            'PASSWORD_HASHER_PROFILE is argon2, but argon2-cffi is not '
+            'installed.',
+            hint='Install argon2-cffi or pick the pbkdf2 profile.',
+            id='core.E002',
+        )]
+
+    return []
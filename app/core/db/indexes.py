@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class UniqueIndex(models.Index):
+    """Unique index, which unlike UniqueConstraint of Django 3.2 may
+    cover expressions such as Lower('name')
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        statement = super().create_sql(model, schema_editor, using, **kwargs)
+        statement.template = statement.template.replace(
+            'CREATE INDEX', 'CREATE UNIQUE INDEX', 1)
+
+        return statement
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class ConnectionPool:
+    """Thread-safe pool of at most max_size database connections
+
+    Connections are handed out most recently used first, which keeps a
+    hot working set and lets surplus connections sit idle. One that
+    has been idle for check_after seconds is health checked before
+    reuse, so connections dropped by the server or a bouncer in the
+    meantime are replaced transparently.
+    """
+
+    def __init__(self, connect, max_size, timeout=5.0, check=None,
+                 check_after=10.0, reset=None):
+        self._connect = connect
+        self._check = check
+        self._check_after = check_after
+        self._reset = reset
+        self._timeout = timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def checkout(self):
+        """Returns an idle connection or a new one, waiting for a slot"""
+
+        if not self._slots.acquire(timeout=self._timeout):
+            raise OperationalError(
+                'No database connection available within %ss' %
+                self._timeout)
+
+        try:
+            while True:
+                with self._lock:
+                    idle = self._idle.pop() if self._idle else None
+
+                if idle is None:
+                    return self._connect()
+
+                connection, returned_at = idle
+                if self._check is None or \
+                        time.monotonic() - returned_at < self._check_after or \
+                        self._check(connection):
+                    return connection
+
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, connection):
+        """Returns connection to the pool, or drops it if not reusable"""
+
+        try:
+            if self._reset is None or self._reset(connection):
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Closes all idle connections"""
+
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+
+        for connection, _ in idle:
+            self._discard(connection)
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,138 @@
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(conn_params, isolation_level):
+    """Opens a connection the way the stock backend does"""
+
+    connection = base.Database.connect(**conn_params)
+    if isolation_level is not None and \
+            isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    base.psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection,
+        loads=lambda x: x
+    )
+
+    return connection
+
+
+def _reset(connection):
+    """Rolls back leftover transaction, returns whether reusable"""
+
+    if connection.closed:
+        return False
+
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            connection.rollback()
+        except base.Database.Error:
+            return False
+
+    return True
+
+
+def _check(connection):
+    """Returns whether connection still answers queries"""
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend with health checks and optional pooling
+
+    With CONN_HEALTH_CHECKS a persistent connection (CONN_MAX_AGE) is
+    checked once per request before its first use, as Django 4.1 does,
+    instead of failing the request if the server dropped it.
+
+    With POOL['MAX_SIZE'] above zero, connections come from a pool
+    shared by all threads of the process, and closing a connection,
+    which Django does at the end of each request with CONN_MAX_AGE 0,
+    returns it to the pool. This suits ASGI, where every request may
+    run in a different thread and so never reuses a thread-local
+    persistent connection.
+    """
+
+    health_check_done = False
+
+    def get_new_connection(self, conn_params):
+        pool = self._get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = pool.checkout()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level',
+            connection.isolation_level
+        )
+
+        return connection
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done \
+                and not self.in_atomic_block \
+                and self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            self.health_check_done = True
+            if not self.is_usable():
+                self.close()
+
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def _close(self):
+        pool = self._get_pool()
+        if self.connection is None or pool is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            pool.checkin(self.connection)
+
+    def _get_pool(self):
+        """Returns connection pool of this alias and process, if enabled"""
+
+        options = self.settings_dict.get('POOL') or {}
+        if not options.get('MAX_SIZE'):
+            return None
+
+        key = (self.alias, os.getpid())
+        with _pools_lock:
+            if key not in _pools:
+                conn_params = self.get_connection_params()
+                isolation_level = self.settings_dict['OPTIONS'].get(
+                    'isolation_level')
+                _pools[key] = ConnectionPool(
+                    lambda: _connect(conn_params, isolation_level),
+                    max_size=options['MAX_SIZE'],
+                    timeout=options.get('TIMEOUT', 5.0),
+                    check=_check if self.settings_dict.get(
+                        'CONN_HEALTH_CHECKS') else None,
+                    check_after=options.get('CHECK_AFTER', 10.0),
+                    reset=_reset
+                )
+
+            return _pools[key]
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.contrib.auth.hashers import \
+    Argon2PasswordHasher, \
+    PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher taking its cost from PASSWORD_PBKDF2_ITERATIONS
+
+    The algorithm name is unchanged, so existing hashes still verify,
+    and must_update flags any hash with a different iteration count,
+    which User.check_password then rehashes on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 hasher taking its cost from PASSWORD_ARGON2_* settings
+
+    Requires the argon2-cffi package.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
@@ -0,0 +1,131 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+_pool = {'key': None, 'executor': None, 'slots': None}
+_pool_lock = threading.Lock()
+
+
+class HashingUnavailable(APIException):
+    """Raised when too many password hashes are already queued"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Server is busy, please retry shortly.')
+    default_code = 'hashing_unavailable'
+    # Sent as Retry-After by the DRF exception handler
+    wait = 1
+
+
+def _init_worker():
+    """Loads Django in worker processes started by spawn"""
+
+    import django
+    django.setup()
+
+
+def _verify(password, encoded):
+    """Returns (is_correct, must_update) of password against encoded"""
+
+    updates = []
+    is_correct = hashers.check_password(password, encoded, updates.append)
+
+    return is_correct, bool(updates)
+
+
+def _get_pool():
+    """Returns (executor, slots) for this process and current settings
+
+    The pool is rebuilt after a fork, so server workers forked from a
+    preloaded master do not share the master's executor.
+    """
+
+    key = (
+        os.getpid(),
+        settings.PASSWORD_HASHING_WORKERS,
+        settings.PASSWORD_HASHING_QUEUE_LIMIT,
+        # Workers only see the hashers configured when they started
+        tuple(settings.PASSWORD_HASHERS)
+    )
+    with _pool_lock:
+        if _pool['key'] != key:
+            if _pool['executor'] is not None and _pool['key'][0] == key[0]:
+                _pool['executor'].shutdown(wait=False)
+            _pool['executor'] = ProcessPoolExecutor(
+                settings.PASSWORD_HASHING_WORKERS,
+                initializer=_init_worker
+            )
+            _pool['slots'] = threading.BoundedSemaphore(
+                settings.PASSWORD_HASHING_QUEUE_LIMIT
+            )
+            _pool['key'] = key
+
+        return _pool['executor'], _pool['slots']
+
+
+def _run(func, *args):
+    """Runs func in the hashing pool, or inline if it is disabled
+
+    Raises HashingUnavailable rather than queueing more than
+    PASSWORD_HASHING_QUEUE_LIMIT hashes, so a login burst is shed
+    instead of starving every other request of CPU.
+    """
+
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return func(*args)
+
+    executor, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingUnavailable()
+
+    try:
+        return executor.submit(func, *args).result()
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool['executor'] is executor:
+                _pool['key'] = _pool['executor'] = None
+        raise HashingUnavailable()
+    finally:
+        slots.release()
+
+
+def new_pool(workers):
+    """Returns a process pool of its own for batch jobs hashing many
+
+    Batches would otherwise be shed by the queue limit of the pool
+    serving requests.
+    """
+
+    return ProcessPoolExecutor(workers, initializer=_init_worker)
+
+
+def make_password(password):
+    """Returns hash of password computed in the hashing pool"""
+
+    if password is None:
+        return hashers.make_password(None)
+
+    return _run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """Checks password against encoded in the hashing pool
+
+    Mirrors django.contrib.auth.hashers.check_password, calling setter
+    when the password is correct but its hash needs upgrading.
+    """
+
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+
+    is_correct, must_update = _run(_verify, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+
+    return is_correct
@@ -0,0 +1,62 @@
+import random
+import time
+
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import OperationalError
+
+_migrated = set()
+
+
+def check_database(alias='default'):
+    """Runs SELECT 1, raising OperationalError if the DB is unreachable"""
+
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def check_migrations(alias='default'):
+    """Returns whether all migrations are applied to the database
+
+    Loading the migration graph is comparatively slow, so a positive
+    answer is remembered for the lifetime of the process.
+    """
+
+    if alias in _migrated:
+        return True
+
+    executor = MigrationExecutor(connections[alias])
+    if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+        return False
+
+    _migrated.add(alias)
+    return True
+
+
+def backoff_delays(base=0.1, cap=5.0):
+    """Yields exponentially growing delays with full jitter"""
+
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
+        attempt += 1
+
+
+def wait_for_database(alias='default', timeout=60.0, on_retry=None):
+    """Waits until SELECT 1 succeeds, returns False past the deadline"""
+
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays():
+        try:
+            check_database(alias)
+            return True
+        except OperationalError as exc:
+            if time.monotonic() + delay > deadline:
+                return False
+            if on_retry is not None:
+                on_retry(exc, delay)
+
+            # Drop the broken connection so the next probe reconnects
+            if not connections[alias].in_atomic_block:
+                connections[alias].close()
+            time.sleep(delay)
@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+MODES = (
+    ('connect per request', {
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'POOL': {'MAX_SIZE': 0},
+    }),
+    ('persistent + health check', {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {'MAX_SIZE': 0},
+    }),
+    ('pool + health check', {
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {'MAX_SIZE': 4},
+    }),
+)
+
+
+class Command(BaseCommand):
+    """Django command timing request cycles under connection strategies
+
+    Each simulated request sends the request signals Django uses to
+    open and release connections around a single SELECT 1, so the
+    difference between modes is the connection handling alone.
+    """
+
+    help = 'Compares per-request DB latency with and without pooling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        original = {key: connection.settings_dict.get(key)
+                    for key in MODES[0][1]}
+
+        self.stdout.write('%-28s %10s %10s' % ('mode', 'p50 ms', 'p99 ms'))
+        try:
+            for name, overrides in MODES:
+                connection.close()
+                connection.settings_dict.update(overrides)
+                timings = self._run(connection, options['requests'])
+                self.stdout.write('%-28s %10.2f %10.2f' % (
+                    name,
+                    statistics.median(timings) * 1000,
+                    timings[max(int(len(timings) * 0.99) - 1, 0)] * 1000
+                ))
+        finally:
+            connection.close()
+            connection.settings_dict.update(original)
+
+    def _run(self, connection, requests):
+        """Returns sorted durations of simulated requests in seconds"""
+
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            request_finished.send(sender=self.__class__)
+            timings.append(time.perf_counter() - start)
+
+        return sorted(timings)
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import \
+    Argon2PasswordHasher, \
+    PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Django command timing password verification of hasher candidates"""
+
+    help = 'Reports p50/p99 verification time of hasher parameters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pbkdf2',
+            nargs='*',
+            type=int,
+            metavar='ITERATIONS',
+            help='PBKDF2 iteration counts to try'
+        )
+        parser.add_argument(
+            '--argon2',
+            nargs='*',
+            default=[],
+            metavar='TIME,MEMORY,PARALLELISM',
+            help='Argon2 cost triples to try, e.g. 2,102400,8'
+        )
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options['pbkdf2']
+        if iterations is None:
+            iterations = [settings.PASSWORD_PBKDF2_ITERATIONS]
+
+        candidates = []
+        for count in iterations:
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = count
+            candidates.append(('pbkdf2 iterations=%d' % count, hasher))
+
+        for triple in options['argon2']:
+            try:
+                time_cost, memory_cost, parallelism = map(
+                    int, triple.split(','))
+            except ValueError:
+                raise CommandError('Invalid argon2 parameters: %s' % triple)
+
+            hasher = Argon2PasswordHasher()
+            hasher.time_cost = time_cost
+            hasher.memory_cost = memory_cost
+            hasher.parallelism = parallelism
+            candidates.append(('argon2 %s' % triple, hasher))
+
+        self.stdout.write('%-32s %10s %10s' % ('hasher', 'p50 ms', 'p99 ms'))
+        for name, hasher in candidates:
+            try:
+                p50, p99 = self._time(hasher, options['rounds'])
+            except ValueError as exc:
+                # Raised by Django when argon2-cffi is not installed
+                raise CommandError(str(exc))
+
+            self.stdout.write('%-32s %10.1f %10.1f' % (
+                name, p50 * 1000, p99 * 1000))
+
+    @staticmethod
+    def _time(hasher, rounds):
+        """Returns (p50, p99) seconds to verify a password with hasher"""
+
+        encoded = hasher.encode('benchmark-password', hasher.salt())
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher.verify('benchmark-password', encoded)
+            timings.append(time.perf_counter() - start)
+
+        timings.sort()
+
+        return (
+            statistics.median(timings),
+            timings[max(int(len(timings) * 0.99) - 1, 0)]
+        )
@@ -0,0 +1,107 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.base import BaseHandler
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core import throttling
+
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# FULL_MIDDLEWARE with the core.middleware variants skipping /api/, and
+# nothing else, so only their savings are measured
+LEAN_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'core.middleware.CsrfViewMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+class Rollback(Exception):
+    """Raised to discard benchmark data"""
+
+
+class Command(BaseCommand):
+    """Django command timing the tag list under both middleware stacks
+
+    Requests go straight through a request handler, without a server
+    or test client, and alternate between the stacks so drift affects
+    both alike. Throttle buckets and the tag cache are reset before each
+    request, so every one is a full 200 rather than a 429 or cache hit.
+    """
+
+    help = 'Compares per-request time of the full and lean middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options['requests'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _run(self, requests):
+        user = get_user_model().objects.create_user(
+            email='benchmark@box.com'
+        )
+        token = Token.objects.create(user=user)
+        request = RequestFactory().get(
+            reverse('recipe:tag-list'),
+            HTTP_HOST='localhost',
+            HTTP_AUTHORIZATION='Token ' + token.key,
+            HTTP_COOKIE='%s=benchmark' % settings.SESSION_COOKIE_NAME
+        )
+
+        handlers = {
+            'full': self._handler(FULL_MIDDLEWARE),
+            'lean': self._handler(LEAN_MIDDLEWARE),
+        }
+        timings = {name: [] for name in handlers}
+        for _ in range(requests):
+            for name, handler in handlers.items():
+                caches[settings.TAG_LIST_CACHE].clear()
+                throttling.reset()
+                start = time.perf_counter()
+                response = handler.get_response(request)
+                timings[name].append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError('%s stack answered %s' % (
+                        name, response.status_code))
+
+        self.stdout.write('%-6s %10s %10s' % ('stack', 'mean us', 'p50 us'))
+        for name, durations in timings.items():
+            self.stdout.write('%-6s %10.0f %10.0f' % (
+                name,
+                statistics.mean(durations) * 1e6,
+                statistics.median(durations) * 1e6
+            ))
+
+    @staticmethod
+    def _handler(middleware):
+        with override_settings(MIDDLEWARE=middleware):
+            handler = BaseHandler()
+            handler.load_middleware()
+
+        return handler
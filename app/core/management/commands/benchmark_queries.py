@@ -0,0 +1,268 @@
+import json
+import statistics
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import authentication, throttling
+from core.models import Tag
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'queries.json'
+PASSWORD = 'benchmark-password'
+
+
+class Rollback(Exception):
+    """Raised to discard benchmark data"""
+
+
+class Command(BaseCommand):
+    """Django command guarding query counts and latency of every endpoint
+
+    Each endpoint is requested with cold caches for a user owning an
+    increasing number of tags. Query counts are read from the
+    Server-Timing header and must neither grow with the data size nor
+    exceed the stored baseline. Latency may exceed the baseline by
+    --threshold plus --slack-ms, as millisecond timings are noisy, but
+    is only compared on the database vendor the baseline was recorded
+    on.
+    """
+
+    help = 'Checks per-endpoint query counts and latency against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10, 100, 1000, 10000, 100000]
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.5,
+            help='Allowed latency increase over baseline, 0.5 is 50%%'
+        )
+        parser.add_argument(
+            '--slack-ms',
+            type=float,
+            default=2.0,
+            help='Allowed latency increase in ms on top of --threshold'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Store results as the new baseline instead of checking'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    results[str(size)] = self._run(size, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+        self._report(results)
+
+        failures = self._growth(results)
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            if failures:
+                raise CommandError('\n'.join(failures))
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(
+                {'vendor': connection.vendor, 'results': results},
+                indent=2,
+                sort_keys=True
+            ) + '\n')
+            self.stdout.write('Baseline written to %s' % baseline_path)
+            return
+
+        if not baseline_path.exists():
+            raise CommandError(
+                'No baseline at %s, run with --update-baseline' %
+                baseline_path
+            )
+        failures += self._compare(
+            json.loads(baseline_path.read_text()),
+            results,
+            options['threshold'],
+            options['slack_ms']
+        )
+        if failures:
+            raise CommandError('\n'.join(failures))
+
+        self.stdout.write(self.style.SUCCESS('Within baseline'))
+
+    def _run(self, size, repeat):
+        """Returns {endpoint: {'queries': n, 'ms': median}} for size"""
+
+        user = get_user_model().objects.create_user(
+            email='benchmark-%s@box.com' % size,
+            password=PASSWORD
+        )
+        Tag.objects.bulk_create(
+            (Tag(user=user, name='tag %d' % i) for i in range(size)),
+            batch_size=5000
+        )
+        token = Token.objects.create(user=user)
+        ids = list(Tag.objects.filter(user=user).order_by('id').values_list(
+            'id', flat=True)[:10])
+
+        client = APIClient()
+        authorized = APIClient(HTTP_AUTHORIZATION='Token ' + token.key)
+        requests = {
+            'user-create': lambda i: client.post(
+                reverse('user:create'),
+                {'email': 'new-%s-%s@box.com' % (size, i),
+                 'password': PASSWORD, 'name': 'new'}
+            ),
+            'user-token': lambda i: client.post(
+                reverse('user:token'),
+                {'email': user.email, 'password': PASSWORD}
+            ),
+            'user-me': lambda i: authorized.get(reverse('user:me')),
+            'tag-list': lambda i: authorized.get(reverse('recipe:tag-list')),
+            'tag-search': lambda i: authorized.get(
+                reverse('recipe:tag-list'),
+                {'q': '%d' % i}
+            ),
+            'tag-most-used': lambda i: authorized.get(
+                reverse('recipe:tag-list'),
+                {'ordering': '-usage'}
+            ),
+            'tag-autocomplete': lambda i: authorized.get(
+                reverse('recipe:tag-autocomplete'),
+                {'q': 'tag %d' % i}
+            ),
+            'tag-create': lambda i: authorized.post(
+                reverse('recipe:tag-list'),
+                {'name': 'new tag %d' % i}
+            ),
+            'tag-update': lambda i: authorized.patch(
+                reverse('recipe:tag-detail', args=[ids[0]]),
+                {'name': 'updated tag %d' % i}
+            ),
+            'tag-batch-rename': lambda i: authorized.post(
+                reverse('recipe:tag-batch-rename'),
+                [{'id': pk, 'name': 'renamed %d %d' % (i, pk)}
+                 for pk in ids[:-1] or ids],
+                format='json'
+            ),
+            'tag-sync': lambda i: authorized.get(reverse('recipe:tag-sync')),
+            'tag-batch-delete': lambda i: authorized.post(
+                reverse('recipe:tag-batch-delete'),
+                {'ids': ids[-1:]},
+                format='json'
+            ),
+        }
+
+        results = {}
+        with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for endpoint, send in requests.items():
+                queries, durations = 0, []
+                for i in range(repeat):
+                    self._clear_caches(token.key)
+                    response = send(i)
+                    if response.status_code >= 400:
+                        raise CommandError('%s answered %s' % (
+                            endpoint, response.status_code))
+                    count, duration = self._server_timing(response)
+                    queries = max(queries, count)
+                    durations.append(duration)
+
+                results[endpoint] = {
+                    'queries': queries,
+                    'ms': round(statistics.median(durations), 2),
+                }
+
+        return results
+
+    @staticmethod
+    def _clear_caches(token_key):
+        caches[settings.TAG_LIST_CACHE].clear()
+        caches[settings.USER_VERSION_CACHE].clear()
+        authentication.invalidate(token_key)
+        throttling.reset()
+
+    @staticmethod
+    def _server_timing(response):
+        """Returns (query count, total ms) from Server-Timing"""
+
+        timings = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            timings[name] = dict(param.split('=', 1) for param in params)
+
+        return (
+            int(timings['db']['desc'].strip('"').split()[0]),
+            float(timings['total']['dur'])
+        )
+
+    def _report(self, results):
+        self.stdout.write('%-16s %8s %8s %10s' % (
+            'endpoint', 'tags', 'queries', 'ms'))
+        for size, endpoints in results.items():
+            for endpoint, result in endpoints.items():
+                self.stdout.write('%-16s %8s %8d %10.2f' % (
+                    endpoint, size, result['queries'], result['ms']))
+
+    @staticmethod
+    def _growth(results):
+        """Returns failures for query counts that grow with data size"""
+
+        failures = []
+        counts = {}
+        for size, endpoints in results.items():
+            for endpoint, result in endpoints.items():
+                counts.setdefault(endpoint, {})[size] = result['queries']
+
+        for endpoint, by_size in counts.items():
+            if len(set(by_size.values())) > 1:
+                failures.append('%s: query count depends on tag count %s' % (
+                    endpoint, by_size))
+
+        return failures
+
+    def _compare(self, baseline, results, threshold, slack_ms):
+        """Returns failures against baseline"""
+
+        compare_latency = baseline['vendor'] == connection.vendor
+        if not compare_latency:
+            self.stderr.write(
+                'Baseline was recorded on %s, comparing query counts only' %
+                baseline['vendor']
+            )
+
+        failures = []
+        for size, endpoints in results.items():
+            for endpoint, result in endpoints.items():
+                expected = baseline['results'].get(size, {}).get(endpoint)
+                if expected is None:
+                    continue
+                if result['queries'] > expected['queries']:
+                    failures.append(
+                        '%s at %s tags: %d queries, baseline %d' % (
+                            endpoint, size, result['queries'],
+                            expected['queries']))
+                if compare_latency and \
+                        result['ms'] > \
+                        expected['ms'] * (1 + threshold) + slack_ms:
+                    failures.append(
+                        '%s at %s tags: %.2f ms, baseline %.2f ms' % (
+                            endpoint, size, result['ms'], expected['ms']))
+
+        return failures
@@ -0,0 +1,68 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command generating concurrent load against a running server
+
+    Compare deployments by running it against the same endpoint served
+    by e.g. `gunicorn app.wsgi` and `uvicorn app.asgi:application` with
+    ASYNC_VIEWS=1, using the same worker count and a high --concurrency.
+    """
+
+    help = 'Sends concurrent requests to a URL and reports latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--token', help='Auth token to send')
+        parser.add_argument(
+            '--header',
+            action='append',
+            default=[],
+            help='Extra "Name: value" header, may be repeated'
+        )
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        headers = {}
+        for header in options['header']:
+            name, value = header.split(':', 1)
+            headers[name.strip()] = value.strip()
+        if options['token']:
+            headers['Authorization'] = 'Token ' + options['token']
+
+        def send(_):
+            request = urllib.request.Request(options['url'], headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    code = response.status
+            except urllib.error.HTTPError as exc:
+                code = exc.code
+            except OSError:
+                code = None
+
+            return code, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for _, latency in results)
+        failed = sum(1 for code, _ in results if code is None or code >= 400)
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+        self.stdout.write('requests:   %d (%d failed)' % (
+            len(results), failed))
+        self.stdout.write('throughput: %.1f req/s' % (
+            len(results) / elapsed))
+        self.stdout.write('latency:    p50 %.1f ms, p99 %.1f ms' % (
+            statistics.median(latencies) * 1000, p99 * 1000))
@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import sys
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+
+from core import hashing
+
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+class Command(BaseCommand):
+    """Django command creating users in bulk from CSV or NDJSON
+
+    Records have an email and optionally a name and password. Passwords
+    are hashed across a process pool while the previous batch is being
+    loaded, with COPY on PostgreSQL and bulk_create elsewhere. Emails
+    the database already has are skipped before hashing, and inserts
+    skip emails created concurrently through the unique email index.
+    Users are created without signals.
+    """
+
+    help = 'Creates users in batches from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, - for stdin')
+        parser.add_argument('--format', choices=sorted(set(FORMATS.values())))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.PASSWORD_HASHING_WORKERS,
+            help='Hashing processes, 0 hashes in this process'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or FORMATS.get(
+            path[path.rfind('.'):].lower())
+        if file_format is None:
+            raise CommandError('Pass --format for %s' % path)
+
+        self.verbosity = options['verbosity']
+        self.counts = {'created': 0, 'duplicate': 0, 'invalid': 0}
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            if path == '-':
+                source = sys.stdin
+            else:
+                try:
+                    source = stack.enter_context(
+                        open(path, newline='', encoding='utf-8'))
+                except OSError as exc:
+                    raise CommandError(str(exc))
+            pool = None
+            if options['workers']:
+                pool = stack.enter_context(
+                    hashing.new_pool(options['workers']))
+
+            self._provision(
+                self._records(source, file_format),
+                options['batch_size'],
+                pool,
+                options['workers']
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            'Created %d users, skipped %d duplicate and %d invalid in '
+            '%.1fs (%.0f users/s)' % (
+                self.counts['created'], self.counts['duplicate'],
+                self.counts['invalid'], elapsed,
+                self.counts['created'] / elapsed if elapsed else 0)
+        )
+
+    def _records(self, source, file_format):
+        """Yields record dicts of source, counting unreadable ones"""
+
+        if file_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                yield record
+            else:
+                self.counts['invalid'] += 1
+
+    def _provision(self, records, batch_size, pool, workers):
+        """Hashes each batch while the batch before it is loaded"""
+
+        seen = set()
+        loading = None
+        while True:
+            batch = self._prepare(islice(records, batch_size), seen)
+            if batch is None:
+                break
+            passwords = [password for user, password in batch]
+            if pool is None:
+                hashed = map(_hash, passwords)
+            else:
+                hashed = pool.map(
+                    _hash,
+                    passwords,
+                    chunksize=max(1, len(passwords) // (workers * 4))
+                )
+
+            if loading is not None:
+                self._load(*loading)
+            loading = batch, hashed
+
+        if loading is not None:
+            self._load(*loading)
+
+    def _prepare(self, records, seen):
+        """Returns [(user, password)] of new emails in records
+
+        Returns None once records are exhausted.
+        """
+
+        User = get_user_model()
+        max_email = User._meta.get_field('email').max_length
+        max_name = User._meta.get_field('name').max_length
+        users = {}
+        read = False
+        for record in records:
+            read = True
+            email = User.objects.normalize_email(
+                str(record.get('email') or '').strip())
+            name = str(record.get('name') or '')
+            password = record.get('password') or None
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.counts['invalid'] += 1
+                continue
+            # COPY and bulk_create would fail the whole batch instead
+            if len(email) > max_email or len(name) > max_name or \
+                    not isinstance(password, (str, type(None))):
+                self.counts['invalid'] += 1
+                continue
+            if email in seen or email in users:
+                self.counts['duplicate'] += 1
+                continue
+            users[email] = (User(email=email, name=name), password)
+
+        if not read:
+            return None
+
+        seen.update(users)
+        existing = set(User.objects.filter(
+            email__in=list(users)).values_list('email', flat=True))
+        self.counts['duplicate'] += len(existing)
+
+        return [
+            item for email, item in users.items() if email not in existing
+        ]
+
+    def _load(self, batch, hashed):
+        """Inserts users of batch with their hashed passwords"""
+
+        if not batch:
+            return
+
+        users = []
+        for (user, password), encoded in zip(batch, hashed):
+            user.password = encoded
+            users.append(user)
+
+        if connection.vendor == 'postgresql':
+            created = _copy(users)
+        else:
+            created = _bulk_create(users)
+
+        self.counts['created'] += created
+        self.counts['duplicate'] += len(users) - created
+        if self.verbosity > 1:
+            self.stdout.write('Created %d users' % self.counts['created'])
+
+
+def _hash(password):
+    """Returns hash of password, unusable if there is none"""
+
+    return hashers.make_password(password)
+
+
+def _bulk_create(users):
+    """Inserts users skipping existing emails, returns number created"""
+
+    User = get_user_model()
+    existing = User.objects.filter(email__in=[user.email for user in users])
+    with transaction.atomic():
+        before = existing.count()
+        User.objects.bulk_create(users, ignore_conflicts=True)
+
+        return existing.count() - before
+
+
+def copy_buffer(users, columns):
+    """Returns CSV of columns of users for COPY ... (FORMAT csv)
+
+    Every field is quoted, as COPY loads an unquoted empty field as
+    NULL, which the NOT NULL columns of the user table reject.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    for user in users:
+        writer.writerow([getattr(user, column) for column in columns])
+    buffer.seek(0)
+
+    return buffer
+
+
+def _copy(users):
+    """Loads users with COPY into a temporary table, returns created
+
+    COPY cannot skip conflicting rows, so rows are moved on from the
+    temporary table with INSERT ... ON CONFLICT DO NOTHING.
+    """
+
+    User = get_user_model()
+    quote = connection.ops.quote_name
+    table = quote(User._meta.db_table)
+    columns = ['email', 'name', 'password', 'is_active', 'is_staff',
+               'is_superuser']
+
+    buffer = copy_buffer(users, columns)
+    column_list = ', '.join(quote(column) for column in columns)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMPORARY TABLE provision_users ON COMMIT DROP AS '
+            'SELECT %s FROM %s WITH NO DATA' % (column_list, table)
+        )
+        cursor.copy_expert(
+            'COPY provision_users (%s) FROM STDIN WITH (FORMAT csv)' %
+            column_list,
+            buffer
+        )
+        cursor.execute(
+            'INSERT INTO %s (%s) SELECT %s FROM provision_users '
+            'ON CONFLICT (%s) DO NOTHING' % (
+                table, column_list, column_list, quote('email'))
+        )
+
+        return cursor.rowcount
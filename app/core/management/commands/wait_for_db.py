@@ -1,23 +1,44 @@
-import time
+from django.core.management.base import BaseCommand, CommandError
 
-from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from core import health
 
 
 class Command(BaseCommand):
     """Django command that pauses execution until DB becomes available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before giving up'
+        )
+        parser.add_argument(
+            '--check-migrations',
+            action='store_true',
+            help='Also require all migrations to be applied'
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.NOTICE('Waiting for database...'))
-        db_connection = None
-        while not db_connection:
-            try:
-                db_connection = connections['default']
-            except OperationalError:
-                self.stdout.write(
-                    self.style.WARNING('DB unavailable, pausing 1 sec'))
-                time.sleep(1)
+
+        def on_retry(exc, delay):
+            self.stdout.write(self.style.WARNING(
+                'DB unavailable, retrying in %.2f sec' % delay))
+
+        available = health.wait_for_database(
+            options['database'],
+            timeout=options['timeout'],
+            on_retry=on_retry
+        )
+        if not available:
+            raise CommandError(
+                'DB unavailable after %s sec' % options['timeout'])
+
+        if options['check_migrations'] and \
+                not health.check_migrations(options['database']):
+            raise CommandError('DB has unapplied migrations')
 
         self.stdout.write(self.style.SUCCESS('DB is available!'))
@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds of duration histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Time spent in each phase of the request being handled"""
+
+    __slots__ = ('queries', 'db', 'serializer', 'render')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.render = 0.0
+
+    def server_timing(self, total):
+        """Returns value of Server-Timing header, durations in ms"""
+
+        return (
+            'db;dur=%.2f;desc="%d queries", serializer;dur=%.2f, '
+            'render;dur=%.2f, total;dur=%.2f' % (
+                self.db * 1000, self.queries, self.serializer * 1000,
+                self.render * 1000, total * 1000)
+        )
+
+
+def start():
+    """Starts collecting metrics of the current request"""
+
+    return _current.set(RequestMetrics())
+
+
+def stop(token):
+    """Stops collecting and returns metrics of the current request"""
+
+    request_metrics = _current.get()
+    _current.reset(token)
+
+    return request_metrics
+
+
+@contextmanager
+def timed(phase):
+    """Adds time spent in the block to phase of the current request"""
+
+    request_metrics = _current.get()
+    if request_metrics is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(
+            request_metrics,
+            phase,
+            getattr(request_metrics, phase) + time.perf_counter() - started
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting and timing queries"""
+
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.db += time.perf_counter() - started
+        request_metrics.queries += 1
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(BUCKETS, value)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Per-route aggregates of request metrics, in process memory
+
+    Every server process keeps its own registry, so each worker has to
+    be scraped, or the numbers are for whichever worker answered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._counters = []
+
+    def counter(self, name, help_text, read):
+        """Exports the counter read() returns on every render
+
+        For counters kept by other modules, which core cannot import.
+        """
+
+        with self._lock:
+            self._counters.append((name, help_text, read))
+
+    def observe(self, route, method, duration, request_metrics):
+        with self._lock:
+            aggregate = self._routes.get((route, method))
+            if aggregate is None:
+                aggregate = self._routes[(route, method)] = {
+                    'duration': _Histogram(),
+                    'db': _Histogram(),
+                    'queries': 0,
+                    'serializer': 0.0,
+                    'render': 0.0,
+                }
+
+            aggregate['duration'].observe(duration)
+            aggregate['db'].observe(request_metrics.db)
+            aggregate['queries'] += request_metrics.queries
+            aggregate['serializer'] += request_metrics.serializer
+            aggregate['render'] += request_metrics.render
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        """Returns aggregates in Prometheus text exposition format"""
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            for name, key, help_text in (
+                    ('api_request_duration_seconds', 'duration',
+                     'Request duration'),
+                    ('api_request_db_duration_seconds', 'db',
+                     'Time spent in database queries per request')):
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s histogram' % name)
+                for (route, method), aggregate in routes:
+                    lines.extend(_histogram_lines(
+                        name, _labels(route, method), aggregate[key]))
+
+            for name, key, help_text in (
+                    ('api_request_db_queries_total', 'queries',
+                     'Database queries'),
+                    ('api_request_serializer_seconds_total', 'serializer',
+                     'Time spent in serializers'),
+                    ('api_request_render_seconds_total', 'render',
+                     'Time spent rendering responses')):
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s counter' % name)
+                for (route, method), aggregate in routes:
+                    lines.append('%s{%s} %s' % (
+                        name, _labels(route, method), aggregate[key]))
+
+            for name, help_text, read in self._counters:
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s counter' % name)
+                lines.append('%s %s' % (name, read()))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(route, method):
+    def escape(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"') \
+            .replace('\n', '\\n')
+
+    return 'route="%s",method="%s"' % (escape(route), escape(method))
+
+
+def _histogram_lines(name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        yield '%s_bucket{%s,le="%s"} %d' % (name, labels, bound, cumulative)
+    yield '%s_bucket{%s,le="+Inf"} %d' % (name, labels, histogram.count)
+    yield '%s_sum{%s} %s' % (name, labels, histogram.sum)
+    yield '%s_count{%s} %d' % (name, labels, histogram.count)
+
+
+registry = Registry()
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
+from django.utils.decorators import sync_and_async_middleware
+
+from core import metrics, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """Lets safe requests read from replicas, with read-your-writes
+
+    A client that made a successful write keeps reading from primary
+    for REPLICA_STICKY_SECONDS, so it does not see replication lag.
+    Views behind ETags additionally pin by user once authenticated,
+    see core.routers.read_primary_if_pinned.
+    """
+
+    if not settings.REPLICA_DATABASES:
+        return get_response
+
+    def begin(request):
+        key = routers.client_key(request)
+        use_replicas = request.method in SAFE_METHODS and not (
+            key and routers.is_pinned(key))
+
+        return key, routers.use_replicas.set(use_replicas)
+
+    def end(request, response, key):
+        if key and request.method not in SAFE_METHODS and \
+                response.status_code < 400:
+            routers.pin(key)
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            key, token = begin(request)
+            try:
+                response = await get_response(request)
+            finally:
+                routers.use_replicas.reset(token)
+            end(request, response, key)
+            return response
+    else:
+        def middleware(request):
+            key, token = begin(request)
+            try:
+                response = get_response(request)
+            finally:
+                routers.use_replicas.reset(token)
+            end(request, response, key)
+            return response
+
+    return middleware
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    """Reports query count, DB, serializer and render time per request
+
+    The breakdown is sent in a Server-Timing header and aggregated per
+    route into the registry served by the metrics view.
+    """
+
+    def end(request, response, started, token):
+        request_metrics = metrics.stop(token)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        metrics.registry.observe(
+            match.route if match else 'unmatched',
+            request.method,
+            duration,
+            request_metrics
+        )
+        response['Server-Timing'] = request_metrics.server_timing(duration)
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            started, token = time.perf_counter(), metrics.start()
+            try:
+                response = await get_response(request)
+            except BaseException:
+                metrics.stop(token)
+                raise
+            end(request, response, started, token)
+            return response
+    else:
+        def middleware(request):
+            started, token = time.perf_counter(), metrics.start()
+            try:
+                response = get_response(request)
+            except BaseException:
+                metrics.stop(token)
+                raise
+            end(request, response, started, token)
+            return response
+
+    return middleware
+
+
+class ApiExemptMixin:
+    """Skips a middleware for requests under API_PATH_PREFIX
+
+    The API authenticates with tokens alone, so sessions, the session
+    based user, messages and CSRF protection only cost it time. They
+    still run for everything else, such as the admin.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(settings.API_PATH_PREFIX):
+            return self.get_response(request)
+
+        return super().__call__(request)
+
+
+class SessionMiddleware(ApiExemptMixin,
+                        sessions_middleware.SessionMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(ApiExemptMixin,
+                               auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(ApiExemptMixin,
+                        messages_middleware.MessageMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(ApiExemptMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Called by the handler directly rather than through __call__
+        if request.path_info.startswith(settings.API_PATH_PREFIX):
+            return None
+
+        return super().process_view(
+            request,
+            callback,
+            callback_args,
+            callback_kwargs
+        )
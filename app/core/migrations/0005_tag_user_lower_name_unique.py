@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Makes tag names unique per user regardless of case
+
+    Duplicates are removed first, keeping the oldest tag of each name.
+    """
+
+    dependencies = [
+        ('core', '0004_tag_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'DELETE FROM core_tag WHERE id NOT IN ('
+            'SELECT MIN(id) FROM core_tag GROUP BY user_id, LOWER(name))',
+            migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX core_tag_user_lower_name_uniq '
+            'ON core_tag (user_id, LOWER(name))',
+            'DROP INDEX core_tag_user_lower_name_uniq'
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:16
+
+import core.db.indexes
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_tag_user_lower_name_unique'),
+    ]
+
+    operations = [
+        # Created by 0005 already. Tracked in state from here on, so
+        # SQLite keeps it when it rebuilds the table to add a column.
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AddIndex(
+                model_name='tag',
+                index=core.db.indexes.UniqueIndex(django.db.models.expressions.F('user'), django.db.models.functions.text.Lower('name'), name='core_tag_user_lower_name_uniq'),
+            ),
+        ]),
+        migrations.AddField(
+            model_name='tag',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# btree_gin lets the GIN index lead with user_id, so a search only
+# reads trigram matches of the searching user. It still serves name
+# searches across users, as in the admin.
+FORWARDS = (
+    'CREATE EXTENSION IF NOT EXISTS btree_gin',
+    'CREATE INDEX IF NOT EXISTS core_tag_user_name_trgm_idx ON core_tag '
+    'USING gin (user_id, UPPER(name::text) gin_trgm_ops)',
+    'DROP INDEX IF EXISTS core_tag_name_trgm_idx',
+)
+
+BACKWARDS = (
+    'CREATE INDEX IF NOT EXISTS core_tag_name_trgm_idx ON core_tag '
+    'USING gin (UPPER(name::text) gin_trgm_ops)',
+    'DROP INDEX IF EXISTS core_tag_user_name_trgm_idx',
+)
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    """Scopes the PostgreSQL trigram index of tag search to the user"""
+
+    dependencies = [
+        ('core', '0008_tag_usage_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgresql(FORWARDS),
+            run_on_postgresql(BACKWARDS)
+        ),
+    ]
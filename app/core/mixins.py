@@ -0,0 +1,60 @@
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import metrics, routers, versions
+
+
+def etag_matches(request, etag):
+    """Returns whether If-None-Match of request covers etag"""
+
+    client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+
+    return etag in client_etags or '*' in client_etags
+
+
+class ConditionalGetMixin:
+    """Answers conditional GETs from the per-user version counter
+
+    The ETag only depends on the version and the request path, so a
+    matching If-None-Match is answered without loading any rows.
+    """
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        # Reads behind the ETag must not lag behind the version
+        if request.user.is_authenticated:
+            routers.read_primary_if_pinned(request.user.pk)
+
+    def get_etag(self, request):
+        return versions.etag(request.user.pk, request.get_full_path())
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """Returns 304 if client copy is current, else runs handler"""
+
+        etag = self.get_etag(request)
+
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (
+                status.HTTP_200_OK,
+                status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+
+        return response
+
+
+class TimedSerializerMixin:
+    """Adds validation and representation time to request metrics"""
+
+    def is_valid(self, raise_exception=False):
+        with metrics.timed('serializer'):
+            return super().is_valid(raise_exception=raise_exception)
+
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            return super().data
@@ -1,10 +1,24 @@
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import \
+    Case, \
+    Count, \
+    F, \
+    OuterRef, \
+    Q, \
+    Subquery, \
+    Value, \
+    When
+from django.db.models.functions import Coalesce, Greatest, Lower
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth.models import \
     AbstractBaseUser, \
     BaseUserManager, \
     PermissionsMixin
 
+from core import hashing
+from core.db.indexes import UniqueIndex
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -38,6 +52,169 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    def set_password(self, raw_password):
+        """Sets password, hashing it in the hashing pool"""
+
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Checks password in the hashing pool, upgrading stale hashes"""
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Hash upgrades are not password changes
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+
+class TagQuerySet(models.QuerySet):
+    def named(self, *names):
+        """Returns tags named any of names, ignoring case
+
+        Compares LOWER(name), so together with a user filter it is a
+        lookup on the core_tag_user_lower_name_uniq index. Names are
+        lowered by the database too, as Python case mapping differs
+        from LOWER() outside ASCII.
+        """
+
+        return self.alias(lower_name=Lower('name')).filter(
+            lower_name__in=[Lower(Value(name)) for name in set(names)]
+        )
+
+    def get_or_create_named(self, user, name):
+        """Returns (tag, created) for tag of user named name, any case"""
+
+        tag = self.filter(user=user).named(name).first()
+        if tag is not None:
+            return tag, False
+
+        try:
+            with transaction.atomic(using=self.db):
+                return self.create(user=user, name=name), True
+        except IntegrityError:
+            # Created concurrently since the lookup above
+            return self.filter(user=user).named(name).get(), False
+
+    def rename(self, names, versions=None):
+        """Renames tags in a single UPDATE, bumping their version
+
+        names maps tag ids to new names. Tags with an id in versions
+        are only renamed while still at that version, so concurrent
+        edits are detected without holding row locks. Returns number
+        of tags renamed. Sends no signals.
+        """
+
+        versions = versions or {}
+        condition = Q(pk__in=[pk for pk in names if pk not in versions])
+        for pk, version in versions.items():
+            condition |= Q(pk=pk, version=version)
+
+        return self.filter(condition).update(
+            name=Case(
+                *(When(pk=pk, then=Value(name))
+                  for pk, name in names.items()),
+                default=F('name')
+            ),
+            version=F('version') + 1,
+            updated_at=timezone.now()
+        )
+
+    def add_usage(self, delta=1):
+        """Adds delta to usage_count of tags in a single UPDATE
+
+        The counter is computed by the database, so concurrent updates
+        are not lost, and never drops below zero. Returns number of
+        tags updated. Sends no signals, so callers must invalidate
+        cached tag lists themselves.
+        """
+
+        return self.update(
+            usage_count=Greatest(F('usage_count') + delta, 0),
+            updated_at=timezone.now()
+        )
+
+    def reconcile_usage(self):
+        """Resets usage_count of drifted tags to their actual usage
+
+        Usage is counted over every relation referencing Tag. Returns
+        number of tags corrected.
+        """
+
+        actual = _usage_count()
+
+        return self.alias(actual_usage=actual).exclude(
+            usage_count=F('actual_usage')
+        ).update(usage_count=actual, updated_at=timezone.now())
+
+    def delete_rows(self):
+        """Deletes tags, returns number deleted
+
+        While no other model references tags, they are deleted in a
+        single DELETE without signals, recording their tombstones for
+        sync in one INSERT. Otherwise delete() follows the cascades and
+        sends the signals, which record the tombstones.
+        """
+
+        if self.model._meta.related_objects:
+            deleted, by_model = self.delete()
+            return by_model.get(self.model._meta.label, 0)
+
+        with transaction.atomic(using=self.db):
+            deleted = list(self.values_list('id', 'user_id'))
+            if not deleted:
+                return 0
+
+            quote = connections[self.db].ops.quote_name
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM %s WHERE %s IN (%s)' % (
+                        quote(self.model._meta.db_table),
+                        quote(self.model._meta.pk.column),
+                        ', '.join(['%s'] * len(deleted))
+                    ),
+                    [tag_id for tag_id, _ in deleted]
+                )
+            TagTombstone.objects.using(self.db).bulk_create(
+                TagTombstone(tag_id=tag_id, user_id=user_id)
+                for tag_id, user_id in deleted
+            )
+
+        return len(deleted)
+
+
+def _usage_count():
+    """Returns expression counting rows referencing the outer tag"""
+
+    counts = []
+    for relation in Tag._meta.related_objects:
+        if relation.many_to_many:
+            model = relation.through
+            field = relation.field.m2m_reverse_field_name()
+        else:
+            model = relation.related_model
+            field = relation.field.name
+        rows = model._base_manager.filter(**{field: OuterRef('pk')})
+        counts.append(Coalesce(
+            Subquery(
+                rows.order_by().values(field).annotate(
+                    count=Count('*')).values('count'),
+                output_field=models.IntegerField()
+            ),
+            0
+        ))
+
+    if not counts:
+        return Value(0, output_field=models.IntegerField())
+
+    total = counts[0]
+    for count in counts[1:]:
+        total = total + count
+
+    return total
+
 
 class Tag(models.Model):
     """Tag used in recipe"""
@@ -47,5 +224,64 @@ class Tag(models.Model):
         on_delete=models.CASCADE
     )
 
+    # Incremented on every rename, for optimistic concurrency
+    version = models.PositiveIntegerField(default=1)
+    # Set on every write, including TagQuerySet.rename, for sync
+    updated_at = models.DateTimeField(auto_now=True)
+    # Number of uses, kept by TagQuerySet.add_usage, as counting on
+    # every list would scan all uses
+    usage_count = models.PositiveIntegerField(default=0)
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Names are unique per user regardless of case
+            UniqueIndex(
+                F('user'),
+                Lower('name'),
+                name='core_tag_user_lower_name_uniq'
+            ),
+            # Backs the keyset pagination of the tags list endpoint,
+            # which orders by (-name, -id) within a single user
+            models.Index(
+                fields=['user', 'name', 'id'],
+                name='core_tag_user_name_id_idx'
+            ),
+            # Backs incremental sync, which seeks by (updated_at, id)
+            models.Index(
+                fields=['user', 'updated_at', 'id'],
+                name='core_tag_user_updated_id_idx'
+            ),
+            # Backs the keyset pagination of ?ordering=-usage
+            models.Index(
+                fields=['user', 'usage_count', 'id'],
+                name='core_tag_user_usage_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class TagTombstone(models.Model):
+    """Deleted tag, kept so clients can sync deletions"""
+    # Tags are deleted together with their user, so the tombstones of
+    # a deleted user must not hold up the delete
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    tag_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Backs incremental sync, which seeks by (deleted_at, tag_id)
+            models.Index(
+                fields=['user', 'deleted_at', 'tag_id'],
+                name='core_tagtomb_user_deleted_idx'
+            ),
+        ]
@@ -0,0 +1,96 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Set by core.middleware for requests that may read from replicas
+use_replicas = ContextVar('use_replicas', default=False)
+
+# Credentials must be readable the moment they are created
+PRIMARY_ONLY_MODELS = ('authtoken.token', 'sessions.session')
+
+
+def client_key(request):
+    """Returns key identifying the client of request, if any"""
+
+    credentials = request.META.get('HTTP_AUTHORIZATION') or \
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+
+    return hashlib.md5(credentials.encode('utf-8')).hexdigest()
+
+
+def _pin_key(key):
+    return 'replica:pinned:%s' % key
+
+
+def pin(key):
+    """Sends reads of client to primary for REPLICA_STICKY_SECONDS"""
+
+    caches[settings.USER_VERSION_CACHE].set(
+        _pin_key(key),
+        True,
+        settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def is_pinned(key):
+    """Returns whether client wrote recently enough to read primary"""
+
+    return bool(caches[settings.USER_VERSION_CACHE].get(_pin_key(key)))
+
+
+def _user_key(user_id):
+    return 'user:%s' % user_id
+
+
+def pin_user(user_id):
+    """Sends reads of user to primary for REPLICA_STICKY_SECONDS
+
+    Unlike client pins, this covers every token and session of the
+    user, whichever of them made the change.
+    """
+
+    if settings.REPLICA_DATABASES:
+        pin(_user_key(user_id))
+
+
+def read_primary_if_pinned(user_id):
+    """Stops replica reads for rest of request if user is pinned
+
+    Called once the request is authenticated, as the middleware only
+    knows the client, not the user.
+    """
+
+    if use_replicas.get() and is_pinned(_user_key(user_id)):
+        use_replicas.set(False)
+
+
+class ReplicaRouter:
+    """Routes reads of safe requests to replicas, everything else to primary
+
+    Reads only go to a replica within a request core.middleware marked
+    safe, so management commands, writes and reads made while handling
+    a write all use primary. Tokens and sessions are always read from
+    primary, so they are usable right after they are created.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.REPLICA_DATABASES and use_replicas.get() and \
+                model._meta.label_lower not in PRIMARY_ONLY_MODELS:
+            return random.choice(settings.REPLICA_DATABASES)
+
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
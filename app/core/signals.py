@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core import authentication, metrics, versions
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stops a deleted or rotated token from authenticating"""
+
+    authentication.invalidate(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drops cached tokens and profile ETags of an updated user
+
+    Covers every save, including admin edits and deactivation.
+    """
+
+    if created:
+        return
+
+    versions.bump(instance.pk)
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    authentication.invalidate(*keys)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Counts and times queries run on connection during requests"""
+
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
@@ -1,7 +1,11 @@
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core import admin, models
+
 
 class AdminSiteTests(TestCase):
     def setUp(self):
@@ -41,3 +45,52 @@ class AdminSiteTests(TestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, 200)
+
+    def test_users_searched_by_email_prefix(self):
+        """Tests searching users by the start of their email"""
+        other = get_user_model().objects.create_user(
+            email='other@box.com',
+            password='test_pw'
+        )
+        url = reverse('admin:core_user_changelist')
+        response = self.client.get(url, {'q': 'dude@'})
+
+        self.assertContains(response, self.user.email)
+        self.assertNotContains(response, other.email)
+
+    def test_tags_listed(self):
+        """Tests listing tags with their users in constant queries"""
+        url = reverse('admin:core_tag_changelist')
+        models.Tag.objects.create(user=self.user, name='First tag')
+
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(url)
+        for i in range(5):
+            user = get_user_model().objects.create_user(
+                email='dude%d@box.com' % i,
+                password='test_pw'
+            )
+            models.Tag.objects.create(user=user, name='Tag %d' % i)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertContains(response, 'First tag')
+        self.assertContains(response, self.user.email)
+        self.assertEqual(len(many), len(one))
+
+    def test_tag_change_page(self):
+        """Tests tag edit page"""
+        tag = models.Tag.objects.create(user=self.user, name='Tag')
+        url = reverse('admin:core_tag_change', args=[tag.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_estimated_count_paginator(self):
+        """Tests counting exactly where no estimate is available"""
+        paginator = admin.EstimatedCountPaginator(
+            models.Tag.objects.order_by('id'),
+            10
+        )
+
+        self.assertEqual(paginator.count, models.Tag.objects.count())
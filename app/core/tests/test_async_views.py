@@ -0,0 +1,113 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core import authentication
+from core.async_views import async_view
+from core.models import Tag
+from recipe.async_views import tag_list_fast_path
+from recipe.views import TagViewset
+from user.async_views import me_fast_path
+from user.views import ManageUserView
+
+tag_list = async_view(
+    TagViewset.as_view(
+        {'get': 'list', 'post': 'create'},
+        basename='tag',
+        detail=False
+    ),
+    tag_list_fast_path
+)
+me = async_view(ManageUserView.as_view(), me_fast_path)
+
+
+class AsyncViewTests(TestCase):
+    """Tests async views and their cache-only fast paths"""
+
+    def setUp(self):
+        authentication._local_cache.clear()
+        caches[settings.TAG_LIST_CACHE].clear()
+        self.user = get_user_model().objects.create_user(
+            email='dude@box.com',
+            password='test_pw',
+            name='dude'
+        )
+        token = Token.objects.create(user=self.user)
+        self.factory = RequestFactory(
+            HTTP_AUTHORIZATION='Token ' + token.key
+        )
+
+    def get(self, view, path, **extra):
+        return async_to_sync(view)(self.factory.get(path, **extra))
+
+    def test_tag_list_served_from_cache(self):
+        """Tests cached tag list is served without queries"""
+
+        Tag.objects.create(user=self.user, name='Cached')
+        first = self.get(tag_list, '/api/recipe/tags/')
+        first.render()
+
+        with self.assertNumQueries(0):
+            second = self.get(tag_list, '/api/recipe/tags/')
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(
+            json.loads(second.content),
+            json.loads(first.content)
+        )
+
+    def test_tag_list_not_modified(self):
+        """Tests unchanged tag list is answered with 304 from cache"""
+
+        etag = self.get(tag_list, '/api/recipe/tags/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.get(
+                tag_list,
+                '/api/recipe/tags/',
+                HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_tag_create_delegated(self):
+        """Tests writes run through the sync view"""
+
+        request = self.factory.post(
+            '/api/recipe/tags/',
+            {'name': 'Async'},
+            content_type='application/json'
+        )
+        response = async_to_sync(tag_list)(request)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Tag.objects.filter(user=self.user, name='Async').exists()
+        )
+
+    def test_me_not_modified(self):
+        """Tests unchanged profile is answered with 304 from cache"""
+
+        etag = self.get(me, '/api/user/me/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.get(me, '/api/user/me/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unauthenticated_delegated(self):
+        """Tests requests without a known token reach the sync view"""
+
+        response = async_to_sync(tag_list)(
+            RequestFactory().get('/api/recipe/tags/')
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
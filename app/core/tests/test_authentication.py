@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import authentication
+
+ME_URL = reverse('user:me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Tests caching of token to user resolution"""
+
+    def setUp(self):
+        authentication._local_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='dude@box.com',
+            password='test_pw',
+            name='dude'
+        )
+        self.token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_repeated_requests_skip_token_lookup(self):
+        """Tests token is only looked up on first request"""
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_rejected(self):
+        """Tests deleting a token stops it from authenticating"""
+
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Tests deactivating a user stops their token authenticating"""
+
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_reloaded(self):
+        """Tests requests see changes made to the user"""
+
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'renamed'})
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.data['name'], 'renamed')
+
+    @override_settings(TOKEN_AUTH_SHARED_CACHE='default')
+    def test_shared_cache_used_on_local_miss(self):
+        """Tests resolution is shared through the configured cache"""
+
+        self.client.get(ME_URL)
+        authentication._local_cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,58 @@
+import sys
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from core import checks
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+SHARED = 'django.core.cache.backends.memcached.PyMemcacheCache'
+
+
+class CheckTests(SimpleTestCase):
+    """Tests system checks of deployment settings"""
+
+    @override_settings(
+        SERVER_WORKERS=4,
+        CACHES={'default': {'BACKEND': LOCMEM}}
+    )
+    def test_process_local_version_cache(self):
+        """Tests several workers with a process-local cache fail"""
+
+        errors = checks.check_shared_version_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+    @override_settings(
+        SERVER_WORKERS=4,
+        CACHES={'default': {'BACKEND': SHARED, 'LOCATION': 'cache:11211'}}
+    )
+    def test_shared_version_cache(self):
+        """Tests several workers with a shared cache pass"""
+
+        self.assertEqual(checks.check_shared_version_cache(None), [])
+
+    @override_settings(
+        SERVER_WORKERS=1,
+        CACHES={'default': {'BACKEND': LOCMEM}}
+    )
+    def test_single_worker(self):
+        """Tests a single worker may keep versions in its own memory"""
+
+        self.assertEqual(checks.check_shared_version_cache(None), [])
+
+    @override_settings(PASSWORD_HASHER_PROFILE='argon2')
+    def test_argon2_profile_not_installed(self):
+        """Tests the argon2 profile fails without argon2-cffi"""
+
+        with patch.dict(sys.modules, {'argon2': None}):
+            errors = checks.check_argon2_installed(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E002'])
+
+    @override_settings(PASSWORD_HASHER_PROFILE='pbkdf2')
+    def test_pbkdf2_profile(self):
+        """Tests the pbkdf2 profile needs no extra library"""
+
+        with patch.dict(sys.modules, {'argon2': None}):
+            self.assertEqual(checks.check_argon2_installed(None), [])
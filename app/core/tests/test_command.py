@@ -1,23 +1,189 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
 from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import TestCase
 
+from core import health
+from core.management.commands import provision_users
+from core.models import Tag
+
 
 class CommandTest(TestCase):
     def test_wait_for_db_ready(self):
         """Tests waiting for db when db is available"""
 
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
+        with patch('core.health.check_database') as cd:
             call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+            self.assertEqual(cd.call_count, 1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
         """Tests waiting for db"""
 
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
+        with patch('core.health.check_database') as cd:
+            cd.side_effect = [OperationalError] * 5 + [True]
             call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+            self.assertEqual(cd.call_count, 6)
+            self.assertEqual(ts.call_count, 5)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_deadline(self, ts):
+        """Tests giving up once the deadline has passed"""
+
+        with patch('core.health.check_database') as cd:
+            cd.side_effect = OperationalError
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=0)
+
+    def test_wait_for_db_pending_migrations(self):
+        """Tests failing when migrations are required but pending"""
+
+        with patch('core.health.check_database'), \
+                patch('core.health.check_migrations', return_value=False):
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', check_migrations=True)
+
+    def test_backoff_delays(self):
+        """Tests delays grow exponentially up to the cap, with jitter"""
+
+        delays = health.backoff_delays(base=1, cap=4)
+
+        with patch('random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([next(delays) for _ in range(5)], [1, 2, 4, 4, 4])
+
+    def test_reconcile_tag_usage(self):
+        """Tests reconciling drifted tag usage counters"""
+
+        user = get_user_model().objects.create_user('user@box.com', 'pw')
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name='tag %d' % i, usage_count=i)
+            for i in range(5)
+        )
+        out = StringIO()
+
+        call_command('reconcile_tag_usage', batch_size=2, stdout=out)
+
+        self.assertIn('Corrected 4 tags', out.getvalue())
+        self.assertFalse(
+            Tag.objects.filter(pk__in=[tag.pk for tag in tags])
+            .exclude(usage_count=0).exists()
+        )
+
+    def test_benchmark_queries_baseline(self):
+        """Tests query counts within the stored baseline pass"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = str(Path(directory) / 'queries.json')
+            options = {'sizes': [1, 20], 'repeat': 1, 'baseline': baseline,
+                       'threshold': 1000, 'stdout': StringIO()}
+
+            call_command('benchmark_queries', update_baseline=True, **options)
+            call_command('benchmark_queries', **options)
+
+            self.assertIn('tag-list', json.loads(
+                Path(baseline).read_text())['results']['20'])
+
+    def test_benchmark_queries_regression(self):
+        """Tests exceeding the baseline query count fails"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / 'queries.json'
+            options = {'sizes': [1], 'repeat': 1, 'baseline': str(baseline),
+                       'threshold': 1000, 'stdout': StringIO()}
+            call_command('benchmark_queries', update_baseline=True, **options)
+
+            stored = json.loads(baseline.read_text())
+            stored['results']['1']['tag-list']['queries'] -= 1
+            baseline.write_text(json.dumps(stored))
+
+            with self.assertRaisesMessage(CommandError, 'tag-list'):
+                call_command('benchmark_queries', **options)
+
+    def test_provision_users_csv(self):
+        """Tests creating users from CSV, skipping duplicates"""
+
+        get_user_model().objects.create_user('taken@box.com', 'pw')
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'users.csv'
+            path.write_text(
+                'email,name,password\n'
+                'new@box.com,New,secret\n'
+                'new@box.com,Again,secret\n'
+                'taken@box.com,Taken,secret\n'
+                'invalid,Invalid,secret\n'
+                'nopassword@box.com,,\n'
+            )
+            call_command(
+                'provision_users',
+                str(path),
+                batch_size=2,
+                workers=0,
+                stdout=out
+            )
+
+        self.assertIn(
+            'Created 2 users, skipped 2 duplicate and 1 invalid',
+            out.getvalue()
+        )
+        user = get_user_model().objects.get(email='new@box.com')
+        self.assertEqual(user.name, 'New')
+        self.assertTrue(user.check_password('secret'))
+        self.assertFalse(get_user_model().objects.get(
+            email='nopassword@box.com').has_usable_password())
+
+    def test_provision_users_ndjson(self):
+        """Tests creating users from NDJSON, counting unreadable lines"""
+
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'users.ndjson'
+            path.write_text(
+                '{"email": "one@box.com", "password": "secret"}\n'
+                'not json\n'
+                '{"email": "two@box.com"}\n'
+            )
+            call_command('provision_users', str(path), workers=0, stdout=out)
+
+        self.assertIn('Created 2 users', out.getvalue())
+        self.assertIn('1 invalid', out.getvalue())
+
+    def test_provision_users_invalid_fields(self):
+        """Tests records with bad passwords or long names are skipped"""
+
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'users.ndjson'
+            path.write_text(
+                '{"email": "one@box.com", "password": 12345}\n'
+                '{"email": "two@box.com", "name": "%s"}\n'
+                '{"email": "three@box.com", "name": "Three"}\n'
+                '{"email": "%s@box.com"}\n' % ('n' * 256, 'e' * 250)
+            )
+            call_command('provision_users', str(path), workers=0, stdout=out)
+
+        self.assertIn('Created 1 users', out.getvalue())
+        self.assertIn('3 invalid', out.getvalue())
+        self.assertEqual(
+            list(get_user_model().objects.values_list('email', flat=True)),
+            ['three@box.com']
+        )
+
+    def test_provision_users_copy_buffer(self):
+        """Tests empty fields are quoted for COPY, not loaded as NULL"""
+
+        user = get_user_model()(email='noname@box.com', name='')
+
+        buffer = provision_users.copy_buffer([user], ['email', 'name'])
+
+        self.assertEqual(buffer.getvalue(), '"noname@box.com",""\r\n')
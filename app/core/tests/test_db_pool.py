@@ -0,0 +1,62 @@
+from unittest.mock import Mock
+
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core.db.pool import ConnectionPool
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests pooling of database connections"""
+
+    def test_connection_reused(self):
+        """Tests returned connections are handed out again"""
+
+        pool = ConnectionPool(Mock(side_effect=lambda: Mock()), max_size=2)
+
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        self.assertIs(pool.checkout(), connection)
+
+    def test_exhausted_pool_times_out(self):
+        """Tests checkout fails once max_size connections are out"""
+
+        pool = ConnectionPool(Mock(), max_size=1, timeout=0.01)
+        pool.checkout()
+
+        with self.assertRaises(OperationalError):
+            pool.checkout()
+
+    def test_unusable_idle_connection_replaced(self):
+        """Tests idle connections failing the health check are dropped"""
+
+        connect = Mock(side_effect=lambda: Mock())
+        pool = ConnectionPool(
+            connect,
+            max_size=1,
+            check=lambda connection: False,
+            check_after=0
+        )
+        stale = pool.checkout()
+        pool.checkin(stale)
+
+        fresh = pool.checkout()
+
+        self.assertIsNot(fresh, stale)
+        stale.close.assert_called_once()
+        self.assertEqual(connect.call_count, 2)
+
+    def test_unresettable_connection_dropped(self):
+        """Tests connections failing reset are closed, freeing the slot"""
+
+        pool = ConnectionPool(
+            Mock(side_effect=lambda: Mock()),
+            max_size=1,
+            reset=lambda connection: False
+        )
+        broken = pool.checkout()
+        pool.checkin(broken)
+
+        self.assertIsNot(pool.checkout(), broken)
+        broken.close.assert_called_once()
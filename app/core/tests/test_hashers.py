@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TOKEN_URL = reverse('user:token')
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class TunableHasherTests(TestCase):
+    """Tests hashes follow the configured cost on login"""
+
+    def setUp(self):
+        self.payload = {'email': 'dude@box.com', 'password': 'test_pw'}
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user = get_user_model().objects.create_user(**self.payload)
+
+    def login(self):
+        response = APIClient().post(TOKEN_URL, self.payload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def iterations(self):
+        return int(self.user.password.split('$')[1])
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=2000)
+    def test_login_upgrades_cost(self):
+        """Tests hash is rehashed with more iterations on login"""
+
+        self.login()
+
+        self.assertEqual(self.iterations(), 2000)
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=500)
+    def test_login_downgrades_cost(self):
+        """Tests hash is rehashed with fewer iterations on login"""
+
+        self.login()
+
+        self.assertEqual(self.iterations(), 500)
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_login_keeps_current_hash(self):
+        """Tests hash of current cost is left alone"""
+
+        password = self.user.password
+        self.login()
+
+        self.assertEqual(self.user.password, password)
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import hashing
+
+CREATE_USER_URL = reverse('user:create')
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=1)
+class HashingPoolTests(TestCase):
+    """Tests password hashing through the worker pool"""
+
+    def test_set_and_check_password(self):
+        """Tests passwords hashed in the pool verify in the pool"""
+
+        user = get_user_model()(email='dude@box.com')
+        user.set_password('test_pw')
+
+        self.assertTrue(user.check_password('test_pw'))
+        self.assertFalse(user.check_password('wrong_pw'))
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_check_password_upgrades_hash(self):
+        """Tests stale hashes are upgraded on successful check"""
+
+        user = get_user_model().objects.create_user(email='dude@box.com')
+        user.password = make_password('test_pw', hasher='md5')
+        user.save()
+
+        self.assertTrue(user.check_password('test_pw'))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+    @override_settings(PASSWORD_HASHING_QUEUE_LIMIT=0)
+    def test_full_queue_rejected(self):
+        """Tests hashing is refused once the queue limit is reached"""
+
+        with self.assertRaises(hashing.HashingUnavailable):
+            hashing.make_password('test_pw')
+
+    @override_settings(PASSWORD_HASHING_QUEUE_LIMIT=0)
+    def test_full_queue_returns_503(self):
+        """Tests API answers 503 with Retry-After when hashing is busy"""
+
+        response = APIClient().post(CREATE_USER_URL, {
+            'email': 'dude@box.com',
+            'password': 'test_pw',
+            'name': 'dude'
+        })
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(get_user_model().objects.exists())
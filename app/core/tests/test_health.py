@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+HEALTHZ_URL = reverse('healthz')
+READYZ_URL = reverse('readyz')
+
+
+class HealthEndpointTests(TestCase):
+    """Tests liveness and readiness probes"""
+
+    def test_healthz(self):
+        """Tests liveness probe answers without touching the DB"""
+
+        with self.assertNumQueries(0):
+            response = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_readyz(self):
+        """Tests readiness probe answers 200 with a migrated DB"""
+
+        self.client.get(READYZ_URL)
+        with self.assertNumQueries(1):
+            response = self.client.get(READYZ_URL)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_readyz_db_unavailable(self):
+        """Tests readiness probe answers 503 when the DB is down"""
+
+        with patch('core.health.check_database') as cd:
+            cd.side_effect = OperationalError
+            response = self.client.get(READYZ_URL)
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_readyz_migrations_pending(self):
+        """Tests readiness probe answers 503 with unapplied migrations"""
+
+        with patch('core.health.check_migrations', return_value=False):
+            response = self.client.get(READYZ_URL)
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import metrics
+from recipe import cache
+
+METRICS_URL = reverse('metrics')
+METRICS_TOKEN = 'scrape-token'
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def server_timing(response):
+    """Returns Server-Timing of response as {metric: params}"""
+
+    timings = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        timings[name] = dict(param.split('=', 1) for param in params)
+
+    return timings
+
+
+@override_settings(METRICS_TOKEN=METRICS_TOKEN)
+class InstrumentationTests(TestCase):
+    """Tests per-request metrics and their Prometheus export"""
+
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Tests responses report query count and phase durations"""
+
+        response = self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        timings = server_timing(response)
+        self.assertGreater(int(timings['db']['desc'].split()[0][1:]), 0)
+        self.assertGreater(float(timings['db']['dur']), 0)
+        self.assertGreater(float(timings['serializer']['dur']), 0)
+        self.assertGreater(float(timings['render']['dur']), 0)
+        self.assertGreaterEqual(
+            float(timings['total']['dur']),
+            float(timings['db']['dur'])
+        )
+
+    def test_metrics_per_route(self):
+        """Tests histograms are exported per route and method"""
+
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+
+        response = self.scrape()
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE api_request_duration_seconds histogram', body)
+        self.assertIn(
+            'api_request_duration_seconds_count'
+            '{route="api/recipe/tags/",method="GET"} 2',
+            body
+        )
+        self.assertIn(
+            'api_request_duration_seconds_bucket'
+            '{route="api/recipe/tags/",method="GET",le="+Inf"} 2',
+            body
+        )
+
+    def test_metrics_tag_cache(self):
+        """Tests tag list cache hits and misses are exported"""
+
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+
+        body = self.scrape().content.decode()
+
+        self.assertIn('# TYPE tag_list_cache_hits_total counter', body)
+        self.assertIn(
+            'tag_list_cache_hits_total %d' % cache.stats()['hits'],
+            body
+        )
+        self.assertIn(
+            'tag_list_cache_misses_total %d' % cache.stats()['misses'],
+            body
+        )
+
+    def scrape(self, token=METRICS_TOKEN):
+        return self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION='Bearer ' + token
+        )
+
+    def test_metrics_token_required(self):
+        """Tests metrics are hidden from clients without the token"""
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 404)
+        self.assertEqual(self.scrape('wrong').status_code, 404)
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.scrape('').status_code, 404)
@@ -0,0 +1,50 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core import middleware
+
+
+def view(request):
+    return HttpResponse()
+
+
+class ApiExemptMiddlewareTests(SimpleTestCase):
+    """Tests session based middleware is skipped for API requests"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_session_skipped_for_api(self):
+        """Tests API requests get neither session nor session user"""
+
+        request = self.factory.get('/api/recipe/tags/')
+        middleware.SessionMiddleware(
+            middleware.AuthenticationMiddleware(view)
+        )(request)
+
+        self.assertFalse(hasattr(request, 'session'))
+        self.assertFalse(hasattr(request, 'user'))
+
+    def test_session_kept_for_admin(self):
+        """Tests other requests still get session and user"""
+
+        request = self.factory.get('/admin/')
+        middleware.SessionMiddleware(
+            middleware.AuthenticationMiddleware(view)
+        )(request)
+
+        self.assertTrue(hasattr(request, 'session'))
+        self.assertTrue(hasattr(request, 'user'))
+
+    def test_csrf_skipped_for_api(self):
+        """Tests API posts are not CSRF checked"""
+
+        csrf = middleware.CsrfViewMiddleware(view)
+
+        api_response = csrf.process_view(
+            self.factory.post('/api/recipe/tags/'), view, (), {})
+        admin_response = csrf.process_view(
+            self.factory.post('/admin/login/'), view, (), {})
+
+        self.assertIsNone(api_response)
+        self.assertEqual(admin_response.status_code, 403)
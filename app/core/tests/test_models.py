@@ -53,3 +53,31 @@ class ModelTests(TestCase):
         )
 
         self.assertEqual(str(tag), tag.name)
+
+    def test_tag_add_usage(self):
+        """Tests usage counters are updated in the database, not below 0"""
+        tag = models.Tag.objects.create(user=sample_user(), name='Tag')
+        tags = models.Tag.objects.filter(pk=tag.pk)
+
+        tags.add_usage()
+        tags.add_usage(2)
+        tag.refresh_from_db()
+        self.assertEqual(tag.usage_count, 3)
+
+        tags.add_usage(-5)
+        tag.refresh_from_db()
+        self.assertEqual(tag.usage_count, 0)
+
+    def test_tag_reconcile_usage(self):
+        """Tests drifted usage counters are reset to actual usage"""
+        user = sample_user()
+        models.Tag.objects.create(user=user, name='Exact')
+        drifted = models.Tag.objects.create(
+            user=user,
+            name='Drifted',
+            usage_count=4
+        )
+
+        self.assertEqual(models.Tag.objects.reconcile_usage(), 1)
+        drifted.refresh_from_db()
+        self.assertEqual(drifted.usage_count, 0)
@@ -0,0 +1,58 @@
+import io
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONTests(TestCase):
+    """Tests orjson backed renderer and parser match the stock ones"""
+
+    data = OrderedDict([
+        ('results', [{'id': 1, 'name': 'Zupa   ąę'}]),
+        ('price', Decimal('1.50')),
+        ('label', gettext_lazy('Tags')),
+        ('next', None),
+    ])
+
+    def test_render_matches_stock_renderer(self):
+        """Tests rendered bytes equal those of JSONRenderer"""
+
+        self.assertEqual(
+            FastJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data)
+        )
+
+    def test_render_indented(self):
+        """Tests indented output falls back to JSONRenderer"""
+
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type)
+        )
+
+    def test_parse_matches_stock_parser(self):
+        """Tests parsed data equals that of JSONParser"""
+
+        body = b'{"name": "Zupa \\u0105", "tags": [1, 2.5, null]}'
+
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_parse_invalid(self):
+        """Tests invalid and non-strict JSON is rejected"""
+
+        for body in (b'{"name": ', b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
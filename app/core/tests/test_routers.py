@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from core import routers, versions
+from core.middleware import replica_routing_middleware
+from core.models import Tag
+
+
+@override_settings(REPLICA_DATABASES=['replica_0'])
+class ReplicaRoutingTests(SimpleTestCase):
+    """Tests routing of reads between primary and replicas"""
+
+    def setUp(self):
+        caches[settings.USER_VERSION_CACHE].clear()
+        self.factory = RequestFactory()
+        self.routed = []
+
+        def view(request):
+            self.routed.append((
+                router.db_for_read(Tag),
+                router.db_for_read(Token),
+                router.db_for_write(Tag)
+            ))
+            return HttpResponse(status=int(request.GET.get('status', 200)))
+
+        self.middleware = replica_routing_middleware(view)
+
+    def request(self, method, token='first', status=200):
+        request = getattr(self.factory, method)(
+            '/api/recipe/tags/?status=%d' % status,
+            HTTP_AUTHORIZATION='Token ' + token
+        )
+        self.middleware(request)
+
+        return self.routed[-1]
+
+    def test_safe_request_reads_replica(self):
+        """Tests GET reads from replica but writes to primary"""
+
+        self.assertEqual(
+            self.request('get'),
+            ('replica_0', 'default', 'default')
+        )
+
+    def test_unsafe_request_reads_primary(self):
+        """Tests POST reads and writes primary"""
+
+        self.assertEqual(self.request('post')[0], 'default')
+
+    def test_reads_sticky_after_write(self):
+        """Tests writer reads primary afterwards, other clients do not"""
+
+        self.request('post')
+
+        self.assertEqual(self.request('get')[0], 'default')
+        self.assertEqual(self.request('get', token='second')[0], 'replica_0')
+
+    def test_failed_write_not_sticky(self):
+        """Tests rejected writes do not pin the client to primary"""
+
+        self.request('post', status=400)
+
+        self.assertEqual(self.request('get')[0], 'replica_0')
+
+    def test_reads_sticky_after_change_of_user(self):
+        """Tests user reads primary with any token after data changed"""
+
+        def view(request):
+            routers.read_primary_if_pinned(1)
+            return HttpResponse(router.db_for_read(Tag))
+
+        middleware = replica_routing_middleware(view)
+        request = self.factory.get(
+            '/api/recipe/tags/',
+            HTTP_AUTHORIZATION='Token second'
+        )
+
+        self.assertEqual(middleware(request).content, b'replica_0')
+        versions.bump(1)
+        self.assertEqual(middleware(request).content, b'default')
+        self.assertEqual(self.request('get', token='third')[0], 'replica_0')
+
+    def test_reads_outside_request_use_primary(self):
+        """Tests commands and shells never read replicas"""
+
+        self.assertEqual(router.db_for_read(Tag), 'default')
+
+    def test_migrations_skip_replicas(self):
+        """Tests replicas are never migrated"""
+
+        self.assertFalse(router.allow_migrate('replica_0', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
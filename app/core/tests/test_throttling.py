@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import throttling
+
+TOKEN_URL = reverse('user:token')
+
+
+class TokenBucketTests(TestCase):
+    """Tests token bucket stores"""
+
+    def test_burst_then_refill(self):
+        """Tests a full bucket admits its capacity, then refills"""
+
+        store = throttling.LocalBucketStore()
+
+        with patch('time.monotonic', return_value=100):
+            results = [store.consume('key', 3, 0.5) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _ in results],
+                         [True, True, True, False])
+        self.assertEqual(results[-1][1], 2)
+
+        with patch('time.monotonic', return_value=102):
+            self.assertEqual(store.consume('key', 3, 0.5), (True, None))
+
+    def test_cache_store_shared(self):
+        """Tests stores on one cache alias share their buckets"""
+
+        first = throttling.CacheBucketStore('default')
+        second = throttling.CacheBucketStore('default')
+        first.clear()
+
+        self.assertTrue(first.consume('key', 1, 0.1)[0])
+        self.assertFalse(second.consume('key', 1, 0.1)[0])
+
+    def test_cache_store_clear(self):
+        """Tests clearing refills buckets, keeping other cache entries"""
+
+        cache = caches['default']
+        cache.set('unrelated', 'kept')
+        store = throttling.CacheBucketStore('default')
+        store.consume('cleared', 1, 0.1)
+
+        store.clear()
+
+        self.assertTrue(store.consume('cleared', 1, 0.1)[0])
+        self.assertEqual(cache.get('unrelated'), 'kept')
+        store.clear()
+
+    def test_parse_rate(self):
+        """Tests rates are parsed to capacity and tokens per second"""
+
+        self.assertEqual(throttling.parse_rate('30/min'), (30, 0.5))
+
+
+class ThrottledViewTests(TestCase):
+    """Tests throttles configured through REST_FRAMEWORK"""
+
+    def setUp(self):
+        self.client = APIClient()
+        throttling.reset()
+
+    def tearDown(self):
+        throttling.reset()
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_CLASSES': [
+            'core.throttling.IPThrottle',
+            'core.throttling.RouteThrottle',
+        ],
+        'DEFAULT_THROTTLE_RATES': {'login.ip': '2/min'},
+    })
+    def test_login_throttled_per_ip(self):
+        """Tests login attempts over the rate get 429 and Retry-After"""
+
+        payload = {'email': 'nobody@box.com', 'password': 'wrong'}
+        codes = [self.client.post(TOKEN_URL, payload).status_code
+                 for _ in range(2)]
+        response = self.client.post(TOKEN_URL, payload)
+        other = self.client.post(TOKEN_URL, payload, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(codes, [status.HTTP_400_BAD_REQUEST] * 2)
+        self.assertEqual(response.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_CLASSES': ['core.throttling.IPThrottle'],
+        'DEFAULT_THROTTLE_RATES': {'login.ip': '1/min'},
+        'NUM_PROXIES': 0,
+    })
+    def test_forwarded_for_ignored(self):
+        """Tests clients cannot pick their address with X-Forwarded-For"""
+
+        payload = {'email': 'nobody@box.com', 'password': 'wrong'}
+        self.client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR='1.1.1.1')
+        response = self.client.post(
+            TOKEN_URL,
+            payload,
+            HTTP_X_FORWARDED_FOR='2.2.2.2'
+        )
+
+        self.assertEqual(response.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Buckets kept by the in-process store, least recently used are dropped
+LOCAL_MAX_BUCKETS = 10000
+
+_DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """Returns (capacity, tokens per second) of rate such as '10/min'"""
+
+    num, period = rate.split('/')
+
+    return int(num), int(num) / _DURATIONS[period[0]]
+
+
+def _take(state, capacity, per_second, now):
+    """Returns (new state, allowed, wait) after taking one token
+
+    state is (tokens, updated) or None for a full bucket.
+    """
+
+    if state is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, state[0] + (now - state[1]) * per_second)
+
+    if tokens >= 1:
+        return (tokens - 1, now), True, None
+
+    return (tokens, now), False, (1 - tokens) / per_second
+
+
+class LocalBucketStore:
+    """Token buckets in process memory, not shared between workers"""
+
+    def __init__(self, max_buckets=LOCAL_MAX_BUCKETS):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_buckets = max_buckets
+
+    def consume(self, key, capacity, per_second):
+        """Takes a token from bucket key, returns (allowed, wait)"""
+
+        with self._lock:
+            state, allowed, wait = _take(
+                self._buckets.get(key),
+                capacity,
+                per_second,
+                time.monotonic()
+            )
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_buckets:
+                self._buckets.popitem(last=False)
+
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Token buckets in a Django cache shared by all workers
+
+    Like DRF's own throttles it reads and writes the bucket without a
+    lock, so concurrent requests for one key may let a few extra
+    through. Buckets expire once they would have refilled.
+    """
+
+    def __init__(self, alias, max_buckets=LOCAL_MAX_BUCKETS):
+        self._cache = caches[alias]
+        # Most recently used keys, so clear() leaves the rest of the
+        # cache alone
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_buckets = max_buckets
+
+    def consume(self, key, capacity, per_second):
+        """Takes a token from bucket key, returns (allowed, wait)"""
+
+        key = 'throttle:%s' % key
+        state, allowed, wait = _take(
+            self._cache.get(key),
+            capacity,
+            per_second,
+            time.time()
+        )
+        self._cache.set(key, state, int(capacity / per_second) + 1)
+
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self._max_buckets:
+                self._keys.popitem(last=False)
+
+        return allowed, wait
+
+    def clear(self):
+        """Deletes buckets recently used by this process"""
+
+        with self._lock:
+            keys, self._keys = list(self._keys), OrderedDict()
+
+        self._cache.delete_many(keys)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Returns bucket store selected by THROTTLE_CACHE"""
+
+    alias = settings.THROTTLE_CACHE
+    store = _stores.get(alias)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(
+                alias,
+                CacheBucketStore(alias) if alias else LocalBucketStore()
+            )
+
+    return store
+
+
+def reset():
+    """Refills buckets of the current store, for tests and benchmarks
+
+    A shared store only refills buckets this process used recently.
+    """
+
+    get_store().clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttles with a token bucket per view scope and client
+
+    The rate comes from DEFAULT_THROTTLE_RATES['<scope>.<kind>'], where
+    scope is throttle_scope of the view or 'default'. Buckets hold as
+    many tokens as the rate allows per period, so '10/min' admits a
+    burst of 10 and then one request every 6 seconds. Views without a
+    rate for this kind are not throttled by it.
+    """
+
+    kind = None
+
+    def get_ident_key(self, request):
+        """Returns the client part of the bucket key, None to skip"""
+
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        self._wait = None
+        scope = getattr(view, 'throttle_scope', None) or 'default'
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(
+            '%s.%s' % (scope, self.kind))
+        if rate is None:
+            return True
+
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+
+        allowed, self._wait = get_store().consume(
+            '%s.%s:%s' % (scope, self.kind, ident),
+            *parse_rate(rate)
+        )
+
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Token bucket per client address"""
+
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Token bucket per authenticated user"""
+
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if not request.user or not request.user.is_authenticated:
+            return None
+
+        return request.user.pk
+
+
+class RouteThrottle(TokenBucketThrottle):
+    """Token bucket shared by all clients of a view scope
+
+    Caps the total rate of expensive views such as login, so a burst
+    spread over many addresses cannot monopolise the server either.
+    """
+
+    kind = 'route'
+
+    def get_ident_key(self, request):
+        return '*'
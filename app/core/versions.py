@@ -0,0 +1,50 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import routers
+
+
+def _cache():
+    return caches[settings.USER_VERSION_CACHE]
+
+
+def _key(user_id):
+    return 'user:version:%s' % user_id
+
+
+def get(user_id):
+    """Returns current version of data owned by user
+
+    Versions start from the current time rather than zero, so a counter
+    lost to eviction never repeats a value a client may have seen.
+    """
+
+    return _cache().get_or_set(_key(user_id), time.time_ns, None)
+
+
+def bump(user_id):
+    """Marks data owned by user as changed
+
+    Also pins the user to primary, so replica reads lagging behind the
+    change are not cached or served under the new version.
+    """
+
+    cache = _cache()
+    cache.add(_key(user_id), time.time_ns(), None)
+    try:
+        cache.incr(_key(user_id))
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(_key(user_id), time.time_ns(), None)
+    routers.pin_user(user_id)
+
+
+def etag(user_id, path):
+    """Returns quoted ETag of resource at path for user"""
+
+    value = '%s:%s' % (get(user_id), path)
+
+    return '"%s"' % hashlib.md5(value.encode('utf-8')).hexdigest()
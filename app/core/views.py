@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db.utils import DatabaseError
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+from rest_framework.authentication import get_authorization_header
+
+from core import health, metrics
+
+
+@never_cache
+@require_safe
+def healthz(request):
+    """Liveness probe, answers as long as the process serves requests"""
+
+    return HttpResponse('ok', content_type='text/plain')
+
+
+@never_cache
+@require_safe
+def readyz(request):
+    """Readiness probe, answers 200 once the database can serve queries
+
+    Neither authenticates nor touches the session, so it costs a single
+    SELECT 1 and can be polled every second.
+    """
+
+    try:
+        health.check_database()
+        if settings.READINESS_CHECK_MIGRATIONS and \
+                not health.check_migrations():
+            return HttpResponse(
+                'migrations pending',
+                content_type='text/plain',
+                status=503
+            )
+    except DatabaseError:
+        return HttpResponse(
+            'database unavailable',
+            content_type='text/plain',
+            status=503
+        )
+
+    return HttpResponse('ok', content_type='text/plain')
+
+
+@never_cache
+@require_safe
+def metrics_view(request):
+    """Per-route request metrics in Prometheus text format
+
+    Only answers scrapers sending METRICS_TOKEN as a bearer token, and
+    nobody while it is unset, since route names and timings are not
+    for the public internet. Client addresses are no proof, as behind
+    a reverse proxy every request comes from the proxy.
+    """
+
+    auth = get_authorization_header(request).split()
+    if not settings.METRICS_TOKEN or len(auth) != 2 or \
+            auth[0].lower() != b'bearer' or \
+            not constant_time_compare(auth[1], settings.METRICS_TOKEN):
+        return HttpResponse(status=404)
+
+    return HttpResponse(
+        metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
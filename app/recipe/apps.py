@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class RecipeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe'
+
+    def ready(self):
+        from core import metrics
+        from recipe import cache, signals  # noqa: F401
+
+        metrics.registry.counter(
+            'tag_list_cache_hits_total',
+            'Tag list pages served from the cache',
+            lambda: cache.stats()['hits']
+        )
+        metrics.registry.counter(
+            'tag_list_cache_misses_total',
+            'Tag list pages built on a cache miss',
+            lambda: cache.stats()['misses']
+        )
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import versions
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.TAG_LIST_CACHE]
+
+
+def _generation_key(user_id):
+    return 'tags:generation:%s' % user_id
+
+
+def _generation(user_id):
+    """Returns current cache generation of user's tag list
+
+    Every cached page embeds the generation in its key, so bumping
+    the generation invalidates all pages of the user at once.
+    """
+
+    return _cache().get_or_set(
+        _generation_key(user_id),
+        lambda: uuid.uuid4().hex,
+        None
+    )
+
+
+def page_key(user_id, url):
+    """Returns cache key of tag list page at URL for user
+
+    The key should be taken before querying, so a concurrent change
+    stores the stale page under the superseded generation.
+    """
+
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    return 'tags:list:%s:%s:%s' % (user_id, _generation(user_id), digest)
+
+
+def _count(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def get_page(key):
+    """Returns cached tag list data under key, None on miss"""
+
+    data = _cache().get(key)
+    _count('misses' if data is None else 'hits')
+
+    return data
+
+
+def set_page(key, data):
+    """Caches rendered tag list data under key"""
+
+    _cache().set(key, data)
+
+
+def invalidate(user_id):
+    """Drops every cached tag list page of user"""
+
+    _cache().set(_generation_key(user_id), uuid.uuid4().hex, None)
+
+
+def tags_changed(user_id):
+    """Invalidates cached lists and ETags derived from user's tags
+
+    Tag signals call this on every save and delete. Writes bypassing
+    signals, such as bulk_create, must call it themselves.
+    """
+
+    invalidate(user_id)
+    versions.bump(user_id)
+
+
+def stats():
+    """Returns hit and miss counters of this process"""
+
+    with _stats_lock:
+        return dict(_stats)
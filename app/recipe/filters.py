@@ -0,0 +1,103 @@
+from django.db import connections
+from django.db.models import Value
+from django.db.models.functions import Collate, Upper
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_PARAM = 'q'
+MATCH_PARAM = 'match'
+ORDERING_PARAM = 'ordering'
+MAX_QUERY_LENGTH = 255
+# Shorter terms have no trigram, so the trigram index cannot help them
+MIN_SUBSTRING_LENGTH = 3
+LAST_CODE_POINT = chr(0x10ffff)
+
+
+def search_term(request):
+    """Returns stripped search term of request, None if there is none"""
+
+    term = request.query_params.get(SEARCH_PARAM, '').strip()
+
+    return term[:MAX_QUERY_LENGTH] or None
+
+
+def _is_postgresql(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def filter_prefix(queryset, prefix):
+    """Returns tags of queryset whose name starts with prefix, any case
+
+    On PostgreSQL this is a range scan over UPPER(name) COLLATE "C",
+    annotated as search_key, which core_tag_user_search_key_idx covers
+    together with the ordering on it. Both bounds are uppercased by the
+    database too, as Python case mapping differs from UPPER(). Under
+    "C" ordering, names starting with the prefix sort between it and
+    the prefix followed by U+10FFFF, the highest code point. Other
+    databases fall back to a case-insensitive LIKE.
+    """
+
+    if not _is_postgresql(queryset):
+        return queryset.filter(name__istartswith=prefix)
+
+    return queryset.alias(
+        search_key=Collate(Upper('name'), 'C')
+    ).filter(
+        search_key__gte=Upper(Value(prefix)),
+        search_key__lte=Upper(Value(prefix + LAST_CODE_POINT))
+    )
+
+
+def autocomplete(queryset, prefix, limit):
+    """Returns first limit tags starting with prefix, by name"""
+
+    queryset = filter_prefix(queryset, prefix)
+    if _is_postgresql(queryset):
+        return queryset.order_by('search_key', 'id')[:limit]
+
+    return queryset.order_by('name', 'id')[:limit]
+
+
+class TagSearchFilter(BaseFilterBackend):
+    """Filters tags by ?q=, as substring or with ?match=prefix
+
+    Substring search is backed on PostgreSQL by the trigram index
+    core_tag_user_name_trgm_idx, prefix search by a range on search_key.
+    Terms shorter than MIN_SUBSTRING_LENGTH always match as prefixes,
+    as a substring search for them would scan every tag of the user.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = search_term(request)
+        if term is None:
+            return queryset
+
+        if request.query_params.get(MATCH_PARAM) == 'prefix' or \
+                len(term) < MIN_SUBSTRING_LENGTH:
+            return filter_prefix(queryset, term)
+
+        return queryset.filter(name__icontains=term)
+
+
+class TagOrderingFilter(BaseFilterBackend):
+    """Orders tags by ?ordering=, ignoring unknown values
+
+    Each ordering ends with the primary key, so it is unique for keyset
+    pagination, and is backed by an index on (user, ..., id).
+    """
+
+    orderings = {
+        'usage': ('usage_count', 'id'),
+        '-usage': ('-usage_count', '-id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        """Returns ordering requested, None for the default"""
+
+        return self.orderings.get(request.query_params.get(ORDERING_PARAM))
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering is None:
+            return queryset
+
+        return queryset.order_by(*ordering)
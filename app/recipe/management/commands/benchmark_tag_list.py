@@ -0,0 +1,70 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Tag
+from recipe.serializers import TagsSerializer, tag_rows
+
+
+class Rollback(Exception):
+    """Raised to discard benchmark data"""
+
+
+class Command(BaseCommand):
+    """Django command comparing tag list serialization paths"""
+
+    help = 'Times TagsSerializer against the values() fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1000, 10000, 100000]
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            '%8s %14s %14s %8s' % ('rows', 'serializer ms', 'values ms', 'x'))
+
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    self._run(size, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _run(self, size, repeat):
+        user = get_user_model().objects.create_user(
+            email='benchmark-%s@box.com' % size
+        )
+        Tag.objects.bulk_create(
+            (Tag(user=user, name='tag %d' % i) for i in range(size)),
+            batch_size=5000
+        )
+        queryset = Tag.objects.filter(user=user).order_by('-name', '-id')
+
+        slow = self._best(
+            lambda: TagsSerializer(queryset.all(), many=True).data,
+            repeat
+        )
+        fast = self._best(lambda: list(tag_rows(queryset.all())), repeat)
+
+        self.stdout.write('%8d %14.1f %14.1f %8.1f' % (
+            size, slow * 1000, fast * 1000, slow / fast))
+
+    @staticmethod
+    def _best(func, repeat):
+        """Returns fastest of repeated runs of func in seconds"""
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        return min(timings)
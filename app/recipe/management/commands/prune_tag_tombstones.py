@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipe import sync
+
+
+class Command(BaseCommand):
+    """Django command deleting tombstones past their retention"""
+
+    help = 'Deletes tag tombstones older than TAG_TOMBSTONE_RETENTION_DAYS'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Deleted %d tombstones' % sync.prune())
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from core.models import Tag
+from recipe import cache
+
+
+class Command(BaseCommand):
+    """Django command correcting drifted tag usage counters
+
+    Tags are reconciled in ranges of ids, so each UPDATE only holds
+    locks on a bounded number of rows.
+    """
+
+    help = 'Resets Tag.usage_count to the actual usage where it drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        size = options['batch_size']
+        last = Tag.objects.aggregate(last=Max('id'))['last'] or 0
+
+        corrected = 0
+        for start in range(1, last + 1, size):
+            tags = Tag.objects.filter(pk__gte=start, pk__lt=start + size)
+            count = tags.reconcile_usage()
+            if count:
+                # UPDATE sends no post_save, so invalidate explicitly
+                for user_id in tags.values_list('user_id', flat=True)\
+                        .distinct():
+                    cache.tags_changed(user_id)
+            corrected += count
+
+        self.stdout.write('Corrected %d tags' % corrected)
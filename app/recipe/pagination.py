@@ -0,0 +1,209 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginates a queryset by seeking past the last seen ordering key
+
+    Unlike offset pagination, the cost of fetching a page does not grow
+    with its position, since every page is a single range scan over
+    an index matching `ordering`. The ordering must be unique, so it
+    should always end with the primary key.
+    """
+
+    ordering = ('-name', '-id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Returns a single page of results seeking from the cursor"""
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            position = self._to_python(queryset.model, position)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        """Wraps page data with links to the neighbouring pages"""
+
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """Returns page size requested by client, capped at max"""
+
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """Returns ordering of a view filter backend, or the default
+
+        As with DRF's cursor pagination, filter backends providing
+        get_ordering() choose the ordering pages are keyed by.
+        """
+
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering is not None:
+                    return tuple(ordering)
+
+        return type(self).ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self._position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(self._position(self.page[0]), True)
+
+    def encode_cursor(self, position, reverse):
+        """Returns URL carrying an opaque cursor for given position"""
+
+        payload = json.dumps({'p': position, 'r': int(reverse)})
+        cursor = base64.urlsafe_b64encode(payload.encode('utf-8'))
+
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            cursor.decode('ascii')
+        )
+
+    def decode_cursor(self, request):
+        """Returns (position, reverse) from cursor in request, if any"""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            position = payload['p']
+            reverse = bool(payload['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering) or \
+                not all(isinstance(value, (str, int, float)) and
+                        not isinstance(value, bool)
+                        for value in position):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def _position(self, item):
+        """Returns ordering key values of a model instance or dict row"""
+
+        if isinstance(item, dict):
+            return [item[field.lstrip('-')] for field in self.ordering]
+
+        return [
+            getattr(item, field.lstrip('-')) for field in self.ordering
+        ]
+
+    def _to_python(self, model, position):
+        """Returns cursor position converted to the ordering fields"""
+
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _seek(ordering, position):
+        """Returns filter selecting rows strictly after position
+
+        For ordering (a, b) this expands the row comparison
+        (a, b) > (x, y) into a > x OR (a = x AND b > y). The redundant
+        a >= x is added in front, as the OR alone gives the database no
+        bound to start the range scan on the matching index from.
+        """
+
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{'%s__%s' % (name, lookup): value})
+            equal[name] = value
+
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+
+        return Q(**{'%s__%s' % (first.lstrip('-'), bound): position[0]}) & \
+            condition
@@ -1,11 +1,85 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.mixins import TimedSerializerMixin
 from core.models import Tag
 
 
-class TagsSerializer(serializers.ModelSerializer):
+class BulkTagsSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """Serializer creating many Tag objects with batched inserts"""
+
+    def create(self, validated_data):
+        """Creates tags, skipping names their user already has, any case
+
+        Rows are inserted with ON CONFLICT DO NOTHING, so the unique
+        index decides which names clash, also with names created
+        concurrently, rather than Python case mapping. Created tags
+        are read back for their ids.
+        """
+
+        items = {}
+        for item in validated_data:
+            items.setdefault((item['user'].pk, item['name']), item)
+        if not items:
+            return []
+
+        users = {item['user'] for item in validated_data}
+        names = [name for _, name in items]
+        existing = set(
+            Tag.objects.filter(user__in=users).named(*names)
+            .values_list('id', flat=True)
+        )
+
+        Tag.objects.bulk_create(
+            (Tag(**item) for item in items.values()),
+            batch_size=settings.TAG_BULK_CREATE_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+        return list(
+            Tag.objects.filter(user__in=users).named(*names)
+            .exclude(id__in=existing).order_by('id')
+        )
+
+
+class TagsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializers for Tag object"""
 
     class Meta:
         model = Tag
-        fields = ('id', 'name')
-        read_only_fields = ('id',)
+        fields = ('id', 'name', 'version', 'usage_count')
+        read_only_fields = ('id', 'version', 'usage_count')
+        list_serializer_class = BulkTagsSerializer
+
+
+class TagUpdateSerializer(TagsSerializer):
+    """Serializer renaming a tag, if still at the given version"""
+
+    version = serializers.IntegerField(min_value=1, required=False)
+
+
+class TagRenameSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for one rename of a batch rename"""
+
+    id = serializers.IntegerField(min_value=1)
+    name = serializers.CharField(max_length=255)
+    version = serializers.IntegerField(min_value=1, required=False)
+
+
+class TagIdsSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for ids of a batch delete"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.TAG_BATCH_MAX_SIZE
+    )
+
+
+def tag_rows(queryset):
+    """Returns queryset of TagsSerializer output as plain dicts
+
+    Read-only fast path for lists: rows come straight from the cursor,
+    skipping model instantiation and per-field to_representation.
+    """
+
+    return queryset.values(*TagsSerializer.Meta.fields)
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Tag, TagTombstone
+from recipe import cache
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_list(sender, instance, **kwargs):
+    """Invalidates cached lists and ETags of the tag owner"""
+
+    cache.tags_changed(instance.user_id)
+
+
+@receiver(post_delete, sender=Tag)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Records the deletion for incremental sync"""
+
+    TagTombstone.objects.using(using).create(
+        user_id=instance.user_id,
+        tag_id=instance.pk
+    )
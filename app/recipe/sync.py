@@ -0,0 +1,146 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from core.models import TagTombstone
+from recipe.serializers import TagsSerializer
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class SyncTokenExpired(APIException):
+    """Raised when tombstones since the sync token were pruned"""
+
+    status_code = status.HTTP_410_GONE
+    default_detail = _('Sync token expired, sync again without a token.')
+    default_code = 'sync_token_expired'
+
+
+def encode_token(changed, deleted):
+    """Returns opaque sync token for stream positions"""
+
+    payload = json.dumps({
+        'c': [changed[0].isoformat(), changed[1]],
+        'd': [deleted[0].isoformat(), deleted[1]],
+    })
+
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_token(token):
+    """Returns (changed, deleted) stream positions of sync token"""
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        positions = tuple(
+            (parse_datetime(payload[key][0]), int(payload[key][1]))
+            for key in ('c', 'd')
+        )
+    except (TypeError, ValueError, KeyError, IndexError, binascii.Error):
+        raise ValidationError({'token': [_('Invalid sync token.')]})
+
+    if any(moment is None or timezone.is_naive(moment)
+           for moment, last_id in positions):
+        raise ValidationError({'token': [_('Invalid sync token.')]})
+
+    return positions
+
+
+def _after(time_field, id_field, position):
+    moment, last_id = position
+
+    return Q(**{'%s__gt' % time_field: moment}) | \
+        Q(**{time_field: moment, '%s__gt' % id_field: last_id})
+
+
+def _next_position(items, limit, settled):
+    """Returns where the next sync of a stream of (id, time) starts
+
+    A stream with a full page continues after its last item. One that
+    is caught up restarts at the settle time, so the next sync sees
+    changes committed late with an earlier timestamp again, rather
+    than missing them.
+    """
+
+    if len(items) == limit:
+        return items[-1][1], items[-1][0]
+
+    return settled, 0
+
+
+def changes(user, token=None):
+    """Returns tags of user changed and deleted since sync token
+
+    Cost is proportional to the number of changes, as both streams are
+    range scans over (user, time, id) indexes. Without a token every
+    tag is returned and deletions start from now. Clients repeat while
+    'more' is true, applying 'changed' before 'deleted', and must
+    treat changes they already have as no-ops.
+    """
+
+    now = timezone.now()
+    settled = now - datetime.timedelta(
+        seconds=settings.TAG_SYNC_SETTLE_SECONDS)
+    limit = settings.TAG_SYNC_PAGE_SIZE
+
+    if token is None:
+        changed_after, deleted_after = (_EPOCH, 0), (settled, 0)
+    else:
+        changed_after, deleted_after = decode_token(token)
+        retention = datetime.timedelta(
+            days=settings.TAG_TOMBSTONE_RETENTION_DAYS)
+        if deleted_after[0] < now - retention:
+            raise SyncTokenExpired()
+
+    rows = list(
+        user.tag_set.filter(_after('updated_at', 'id', changed_after))
+        .order_by('updated_at', 'id')
+        .values(*TagsSerializer.Meta.fields, 'updated_at')[:limit + 1]
+    )
+    tombstones = list(
+        TagTombstone.objects.filter(user=user)
+        .filter(_after('deleted_at', 'tag_id', deleted_after))
+        .order_by('deleted_at', 'tag_id')
+        .values_list('tag_id', 'deleted_at')[:limit + 1]
+    )
+    more = len(rows) > limit or len(tombstones) > limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+
+    token = encode_token(
+        _next_position(
+            [(row['id'], row['updated_at']) for row in rows],
+            limit,
+            settled
+        ),
+        _next_position(tombstones, limit, settled)
+    )
+    for row in rows:
+        del row['updated_at']
+
+    return {
+        'changed': rows,
+        'deleted': [tag_id for tag_id, deleted_at in tombstones],
+        'token': token,
+        'more': more,
+    }
+
+
+def prune():
+    """Deletes tombstones older than the retention, returns count"""
+
+    cutoff = timezone.now() - datetime.timedelta(
+        days=settings.TAG_TOMBSTONE_RETENTION_DAYS)
+
+    deleted, _rows = TagTombstone.objects.filter(
+        deleted_at__lt=cutoff).delete()
+
+    return deleted
@@ -1,15 +1,36 @@
+import base64
+import datetime
+import json
+from unittest.mock import patch
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import IntegrityError, connection, transaction
 from django.urls import reverse
+from django.utils import timezone
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Tag
+from core.models import Tag, TagTombstone
 
+from recipe import sync
 from recipe.serializers import TagsSerializer
 
 TAGS_URL = reverse('recipe:tag-list')
+BULK_TAGS_URL = reverse('recipe:tag-bulk-create')
+EXPORT_TAGS_URL = reverse('recipe:tag-export')
+AUTOCOMPLETE_TAGS_URL = reverse('recipe:tag-autocomplete')
+BATCH_RENAME_URL = reverse('recipe:tag-batch-rename')
+BATCH_DELETE_URL = reverse('recipe:tag-batch-delete')
+SYNC_TAGS_URL = reverse('recipe:tag-sync')
+
+
+def detail_url(tag_id):
+    return reverse('recipe:tag-detail', args=[tag_id])
 
 
 class PublicTagsApiTest(TestCase):
@@ -40,6 +61,8 @@ class PrivateTagsApiTest(TestCase):
 
         self.client = APIClient()
         self.client.force_authenticate(self.user)
+        caches[settings.TAG_LIST_CACHE].clear()
+        caches[settings.USER_VERSION_CACHE].clear()
 
     def test_retrieve_tags(self):
         """Tests retrieving tags"""
@@ -49,11 +72,11 @@ class PrivateTagsApiTest(TestCase):
 
         res = self.client.get(TAGS_URL)
 
-        tags = Tag.objects.all().order_by('-name')
+        tags = Tag.objects.all().order_by('-name', '-id')
         serializer = TagsSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Tests returned tags belong to authenticated user only"""
@@ -73,8 +96,8 @@ class PrivateTagsApiTest(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tag_successfull(self):
         """Tests creating new tags"""
@@ -89,9 +112,544 @@ class PrivateTagsApiTest(TestCase):
 
         self.assertTrue(exists)
 
+    def test_create_existing_tag(self):
+        """Tests creating a name the user has, in any case, returns it"""
+
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.post(TAGS_URL, {'name': 'VEGAN'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {'id': tag.id, 'name': 'Vegan', 'version': 1, 'usage_count': 0}
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_create_existing_tag_non_ascii(self):
+        """Tests non-ASCII names match as the database compares them"""
+
+        first = self.client.post(TAGS_URL, {'name': 'Äpfel'})
+        second = self.client.post(TAGS_URL, {'name': 'Äpfel'})
+        bulk = self.client.post(
+            BULK_TAGS_URL,
+            [{'name': 'Äpfel'}, {'name': 'Öl'}],
+            format='json'
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual([tag['name'] for tag in bulk.data], ['Öl'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_duplicate_tag_rejected_by_index(self):
+        """Tests the database rejects names differing only in case"""
+
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Tag.objects.create(user=self.user, name='vegan')
+
     def test_create_tag_invalid_name(self):
         """Tests creating new tag with invalid payload"""
 
         payload = {'name': ''}
         res = self.client.post(TAGS_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_tags_paginated(self):
+        """Tests walking tag pages forward and back with cursors"""
+
+        for name in ('a', 'b', 'c', 'd', 'e'):
+            Tag.objects.create(user=self.user, name=name)
+        expected = TagsSerializer(
+            Tag.objects.all().order_by('-name', '-id'),
+            many=True
+        ).data
+
+        res = self.client.get(TAGS_URL, {'page_size': 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], expected[:2])
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(res.data['results'], expected[2:4])
+
+        page_two_previous = res.data['previous']
+        res = self.client.get(res.data['next'])
+        self.assertEqual(res.data['results'], expected[4:])
+        self.assertIsNone(res.data['next'])
+
+        res = self.client.get(page_two_previous)
+        self.assertEqual(res.data['results'], expected[:2])
+
+    def test_retrieve_tags_page_bounded(self):
+        """Tests page queries bound the leading ordering column"""
+
+        Tag.objects.create(user=self.user, name='a')
+        Tag.objects.create(user=self.user, name='b')
+        res = self.client.get(TAGS_URL, {'page_size': 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(res.data['next'])
+
+        self.assertTrue(any(
+            '"core_tag"."name" <= ' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_retrieve_tags_invalid_cursor(self):
+        """Tests malformed cursors are rejected"""
+
+        res = self.client.get(TAGS_URL, {'cursor': 'garbage'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        for position in ([None, 1], ['a', None], [['a'], 1]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({'p': position, 'r': 0}).encode()).decode()
+            res = self.client.get(TAGS_URL, {'cursor': cursor})
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_tags_cached(self):
+        """Tests repeated listing is served from cache without queries"""
+
+        Tag.objects.create(user=self.user, name='Cached')
+        first = self.client.get(TAGS_URL)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(TAGS_URL)
+
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_create_tag_invalidates_cache(self):
+        """Tests creating a tag drops the cached list"""
+
+        self.client.get(TAGS_URL)
+        self.client.post(TAGS_URL, {'name': 'Fresh'})
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['name'], 'Fresh')
+
+    def test_delete_tag_invalidates_cache(self):
+        """Tests deleting a tag drops the cached list"""
+
+        tag = Tag.objects.create(user=self.user, name='Doomed')
+        self.client.get(TAGS_URL)
+        tag.delete()
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'], [])
+
+    def test_retrieve_tags_not_modified(self):
+        """Tests unchanged tag list is answered with 304"""
+
+        Tag.objects.create(user=self.user, name='Stable')
+        res = self.client.get(TAGS_URL)
+        etag = res['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_retrieve_tags_modified(self):
+        """Tests changed tag list is sent in full with new ETag"""
+
+        res = self.client.get(TAGS_URL)
+        etag = res['ETag']
+        Tag.objects.create(user=self.user, name='New')
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_bulk_create_tags(self):
+        """Tests creating many tags in a single request"""
+
+        payload = [{'name': 'Vegan'}, {'name': 'Dessert'}]
+        res = self.client.post(BULK_TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(Tag.objects.filter(user=self.user).values_list(
+                'name', flat=True)),
+            {'Vegan', 'Dessert'}
+        )
+
+    def test_bulk_create_tags_skips_duplicates(self):
+        """Tests bulk create skips names the user already has"""
+
+        user2 = get_user_model().objects.create_user(
+            'otherdude@box.com',
+            'awesomepw'
+        )
+        Tag.objects.create(user=user2, name='Vegan')
+        Tag.objects.create(user=self.user, name='Dessert')
+
+        payload = [{'name': 'Vegan'}, {'name': 'dessert'}, {'name': 'VEGAN'}]
+        res = self.client.post(BULK_TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 1)
+        self.assertIsNotNone(res.data[0]['id'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_create_tags_invalid(self):
+        """Tests bulk create is rejected if any tag is invalid"""
+
+        payload = [{'name': 'Vegan'}, {'name': ''}]
+        res = self.client.post(BULK_TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.filter(user=self.user).exists())
+
+    def test_bulk_create_tags_too_many(self):
+        """Tests bulk create rejects more tags than a batch may hold"""
+
+        payload = [{'name': 'tag %d' % i} for i in range(3)]
+        with self.settings(TAG_BATCH_MAX_SIZE=2):
+            res = self.client.post(BULK_TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.filter(user=self.user).exists())
+
+    def test_bulk_create_tags_invalidates_cache(self):
+        """Tests bulk create drops the cached list"""
+
+        self.client.get(TAGS_URL)
+        self.client.post(BULK_TAGS_URL, [{'name': 'Bulk'}], format='json')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_export_tags(self):
+        """Tests exporting tags of the user as NDJSON"""
+
+        user2 = get_user_model().objects.create_user(
+            'otherdude@box.com',
+            'awesomepw'
+        )
+        Tag.objects.create(user=user2, name='Foreign')
+        tag1 = Tag.objects.create(user=self.user, name='A')
+        tag2 = Tag.objects.create(user=self.user, name='B')
+
+        res = self.client.get(EXPORT_TAGS_URL)
+        lines = b''.join(res.streaming_content).decode().splitlines()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {'id': tag2.id, 'name': tag2.name},
+                {'id': tag1.id, 'name': tag1.name},
+            ]
+        )
+
+    def test_search_tags(self):
+        """Tests ?q= matches substrings of the user's tag names, any case"""
+
+        user2 = get_user_model().objects.create_user(
+            'otherdude@box.com',
+            'awesomepw'
+        )
+        Tag.objects.create(user=user2, name='Vegan')
+        Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Vegetarian')
+        Tag.objects.create(user=self.user, name='Dessert')
+
+        res = self.client.get(TAGS_URL, {'q': 'EGA'})
+        prefix = self.client.get(TAGS_URL, {'q': 'ar', 'match': 'prefix'})
+
+        self.assertEqual(
+            [tag['name'] for tag in res.data['results']],
+            ['Vegan']
+        )
+        self.assertEqual(prefix.data['results'], [])
+
+    def test_search_tags_short_term(self):
+        """Tests ?q= shorter than three characters matches prefixes"""
+
+        Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Curry')
+
+        res = self.client.get(TAGS_URL, {'q': 'cu'})
+        inner = self.client.get(TAGS_URL, {'q': 'ur'})
+
+        self.assertEqual(
+            [tag['name'] for tag in res.data['results']],
+            ['Curry']
+        )
+        self.assertEqual(inner.data['results'], [])
+
+    def test_autocomplete_tags(self):
+        """Tests autocomplete returns first prefix matches by name"""
+
+        for name in ('veggie', 'Vegan', 'Dessert', 'Vegetarian'):
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(AUTOCOMPLETE_TAGS_URL, {'q': 'veg', 'limit': 2})
+        empty = self.client.get(AUTOCOMPLETE_TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in res.data],
+            ['Vegan', 'Vegetarian']
+        )
+        self.assertEqual(empty.data, [])
+
+    def test_retrieve_tag(self):
+        """Tests retrieving a single tag with its version"""
+
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.get(detail_url(tag.id))
+
+        self.assertEqual(
+            res.data,
+            {'id': tag.id, 'name': 'Vegan', 'version': 1, 'usage_count': 0}
+        )
+
+    def test_update_tag(self):
+        """Tests renaming a tag bumps its version"""
+
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.patch(detail_url(tag.id), {'name': 'Plant based'})
+
+        tag.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(tag.name, 'Plant based')
+        self.assertEqual(tag.version, 2)
+        self.assertEqual(res.data['version'], 2)
+
+    def test_update_tag_outdated_version(self):
+        """Tests renaming with an outdated version conflicts"""
+
+        tag = Tag.objects.create(user=self.user, name='Vegan', version=3)
+
+        res = self.client.put(
+            detail_url(tag.id),
+            {'name': 'Plant based', 'version': 2}
+        )
+
+        tag.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['tags'], [{'id': tag.id, 'version': 3}])
+        self.assertEqual(tag.name, 'Vegan')
+
+    def test_update_tag_of_other_user(self):
+        """Tests tags of other users cannot be changed"""
+
+        user2 = get_user_model().objects.create_user(
+            'otherdude@box.com',
+            'awesomepw'
+        )
+        tag = Tag.objects.create(user=user2, name='Vegan')
+
+        res = self.client.patch(detail_url(tag.id), {'name': 'Mine'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete_tag(self):
+        """Tests deleting a single tag"""
+
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.delete(detail_url(tag.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Tag.objects.filter(id=tag.id).exists())
+
+    def test_batch_rename_tags(self):
+        """Tests renaming many tags in one statement"""
+
+        tag1 = Tag.objects.create(user=self.user, name='a')
+        tag2 = Tag.objects.create(user=self.user, name='b')
+        self.client.get(TAGS_URL)
+
+        payload = [
+            {'id': tag1.id, 'name': 'x', 'version': 1},
+            {'id': tag2.id, 'name': 'y'},
+        ]
+        with self.assertNumQueries(3):
+            res = self.client.post(BATCH_RENAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(Tag.objects.order_by('id').values_list('name', 'version')),
+            [('x', 2), ('y', 2)]
+        )
+        self.assertEqual(self.client.get(TAGS_URL)['X-Cache'], 'MISS')
+
+    def test_batch_rename_tags_conflict(self):
+        """Tests a batch with one outdated version renames nothing"""
+
+        tag1 = Tag.objects.create(user=self.user, name='a')
+        tag2 = Tag.objects.create(user=self.user, name='b', version=2)
+
+        payload = [
+            {'id': tag1.id, 'name': 'x'},
+            {'id': tag2.id, 'name': 'y', 'version': 1},
+        ]
+        res = self.client.post(BATCH_RENAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            list(Tag.objects.order_by('id').values_list('name', flat=True)),
+            ['a', 'b']
+        )
+
+    def test_batch_rename_tags_duplicate_name(self):
+        """Tests renaming to a name the user has is rejected"""
+
+        tag = Tag.objects.create(user=self.user, name='a')
+        Tag.objects.create(user=self.user, name='b')
+
+        payload = [{'id': tag.id, 'name': 'B'}]
+        res = self.client.post(BATCH_RENAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_delete_tags(self):
+        """Tests deleting many tags of the user in one statement"""
+
+        user2 = get_user_model().objects.create_user(
+            'otherdude@box.com',
+            'awesomepw'
+        )
+        foreign = Tag.objects.create(user=user2, name='Foreign')
+        tag1 = Tag.objects.create(user=self.user, name='a')
+        tag2 = Tag.objects.create(user=self.user, name='b')
+        self.client.get(TAGS_URL)
+
+        res = self.client.post(
+            BATCH_DELETE_URL,
+            {'ids': [tag1.id, tag2.id, foreign.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.data, {'deleted': 2})
+        self.assertEqual(list(Tag.objects.all()), [foreign])
+        self.assertEqual(self.client.get(TAGS_URL)['X-Cache'], 'MISS')
+
+    def test_batch_delete_referenced_tags(self):
+        """Tests referenced tags are deleted through cascades"""
+
+        tag = Tag.objects.create(user=self.user, name='a')
+
+        with patch.object(Tag._meta, 'related_objects', [object()]):
+            res = self.client.post(
+                BATCH_DELETE_URL,
+                {'ids': [tag.id]},
+                format='json'
+            )
+
+        self.assertEqual(res.data, {'deleted': 1})
+        self.assertFalse(Tag.objects.filter(pk=tag.pk).exists())
+        self.assertEqual(
+            TagTombstone.objects.filter(tag_id=tag.id).count(),
+            1
+        )
+
+    def test_sync_tags(self):
+        """Tests sync returns all tags, then only changes since token"""
+
+        kept = Tag.objects.create(user=self.user, name='Kept')
+        renamed = Tag.objects.create(user=self.user, name='Old')
+        deleted = Tag.objects.create(user=self.user, name='Doomed')
+
+        first = self.client.get(SYNC_TAGS_URL)
+        self.assertEqual(
+            {tag['id'] for tag in first.data['changed']},
+            {kept.id, renamed.id, deleted.id}
+        )
+        self.assertFalse(first.data['more'])
+
+        past = timezone.now() - datetime.timedelta(minutes=1)
+        Tag.objects.filter(user=self.user).update(
+            updated_at=past - datetime.timedelta(seconds=1))
+        token = sync.encode_token((past, 0), (past, 0))
+        self.client.patch(detail_url(renamed.id), {'name': 'New'})
+        self.client.delete(detail_url(deleted.id))
+
+        res = self.client.get(SYNC_TAGS_URL, {'token': token})
+
+        self.assertEqual(
+            [(tag['id'], tag['name']) for tag in res.data['changed']],
+            [(renamed.id, 'New')]
+        )
+        self.assertEqual(res.data['deleted'], [deleted.id])
+
+    def test_sync_tags_paged(self):
+        """Tests sync pages through many changes with 'more'"""
+
+        for name in ('a', 'b', 'c'):
+            Tag.objects.create(user=self.user, name=name)
+
+        seen = []
+        token = None
+        with self.settings(TAG_SYNC_PAGE_SIZE=2):
+            while True:
+                params = {'token': token} if token else {}
+                res = self.client.get(SYNC_TAGS_URL, params)
+                seen += [tag['name'] for tag in res.data['changed']]
+                token = res.data['token']
+                if not res.data['more']:
+                    break
+
+        self.assertEqual(sorted(set(seen)), ['a', 'b', 'c'])
+
+    def test_sync_tags_batch_delete(self):
+        """Tests batch deletes are synced as deletions"""
+
+        tag = Tag.objects.create(user=self.user, name='a')
+        past = timezone.now() - datetime.timedelta(minutes=1)
+        token = sync.encode_token((past, 0), (past, 0))
+
+        self.client.post(BATCH_DELETE_URL, {'ids': [tag.id]}, format='json')
+        res = self.client.get(SYNC_TAGS_URL, {'token': token})
+
+        self.assertEqual(res.data['deleted'], [tag.id])
+
+    def test_sync_tags_expired_token(self):
+        """Tests tokens older than the tombstone retention are refused"""
+
+        past = timezone.now() - datetime.timedelta(days=365)
+        token = sync.encode_token((past, 0), (past, 0))
+
+        res = self.client.get(SYNC_TAGS_URL, {'token': token})
+        invalid = self.client.get(SYNC_TAGS_URL, {'token': 'garbage'})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_tags_by_usage(self):
+        """Tests listing most used tags first, paginated"""
+
+        for name, usage in (('a', 2), ('b', 0), ('c', 5), ('d', 2)):
+            Tag.objects.create(user=self.user, name=name, usage_count=usage)
+
+        first = self.client.get(
+            TAGS_URL,
+            {'ordering': '-usage', 'page_size': 2}
+        )
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(
+            [tag['name'] for tag in first.data['results'] +
+             second.data['results']],
+            ['c', 'd', 'a', 'b']
+        )
@@ -1,12 +1,26 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from core.async_views import deployment_view
 from recipe import views
+from recipe.async_views import tag_list_fast_path
 
 router = DefaultRouter()
 router.register('tags', views.TagViewset)
 
 app_name = 'recipe'
 urlpatterns = [
+    path(
+        'tags/',
+        deployment_view(
+            views.TagViewset.as_view(
+                {'get': 'list', 'post': 'create'},
+                basename='tag',
+                detail=False
+            ),
+            tag_list_fast_path
+        ),
+        name='tag-list'
+    ),
     path('', include(router.urls))
 ]
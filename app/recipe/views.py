@@ -1,28 +1,291 @@
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import _positive_int
+from rest_framework.response import Response
 
+from core.authentication import CachedTokenAuthentication
+from core.mixins import ConditionalGetMixin
 from core.models import Tag
-from recipe import serializers
+from recipe import cache, filters, serializers, sync
+from recipe.pagination import KeysetPagination
+
 
+class _Rollback(Exception):
+    """Raised to undo a partially applied batch"""
 
-class TagViewset(viewsets.GenericViewSet,
+
+class TagViewset(ConditionalGetMixin,
+                 viewsets.GenericViewSet,
                  mixins.ListModelMixin,
-                 mixins.CreateModelMixin):
+                 mixins.CreateModelMixin,
+                 mixins.RetrieveModelMixin,
+                 mixins.UpdateModelMixin,
+                 mixins.DestroyModelMixin):
 
     """Manages tags in DB"""
 
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     queryset = Tag.objects.all()
     serializer_class = serializers.TagsSerializer
+    pagination_class = KeysetPagination
+    filter_backends = (filters.TagSearchFilter, filters.TagOrderingFilter)
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
+    action_serializers = {
+        'update': serializers.TagUpdateSerializer,
+        'partial_update': serializers.TagUpdateSerializer,
+        'batch_rename': serializers.TagRenameSerializer,
+        'batch_delete': serializers.TagIdsSerializer,
+    }
 
     def get_queryset(self):
         """Returns objects for current authenticated user only"""
 
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        return self.queryset.filter(user=self.request.user).order_by(
+            '-name',
+            '-id'
+        )
+
+    def get_serializer_class(self):
+        return self.action_serializers.get(
+            self.action,
+            super().get_serializer_class()
+        )
+
+    def list(self, request, *args, **kwargs):
+        """Lists tags, answering unchanged lists with 304"""
+
+        return self.conditional_response(
+            request,
+            self.cached_list,
+            *args,
+            **kwargs
+        )
+
+    def cached_list(self, request, *args, **kwargs):
+        """Lists tags, serving repeated requests from the tag cache"""
+
+        def build():
+            page = self.paginate_queryset(serializers.tag_rows(
+                self.filter_queryset(self.get_queryset())
+            ))
+            return self.get_paginated_response(page).data
+
+        return self.cached_response(request, build)
+
+    def cached_response(self, request, build):
+        """Returns data of build(), cached per user and request URL"""
+
+        key = cache.page_key(request.user.pk, request.build_absolute_uri())
+        data = cache.get_page(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        data = build()
+        cache.set_page(key, data)
+        response = Response(data)
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+    def create(self, request, *args, **kwargs):
+        """Creates tag, or returns existing tag of that name with 200
+
+        Names are matched ignoring case, so clients can create without
+        listing tags first and retry safely.
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Creating the tag drops the cached list via recipe.signals
+        serializer.instance, created = Tag.objects.get_or_create_named(
+            request.user,
+            serializer.validated_data['name']
+        )
+
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def update(self, request, *args, **kwargs):
+        """Renames tag, with 409 if the version sent is outdated
+
+        Without a version, the tag is renamed if it has not changed
+        since it was read for this request.
+        """
+
+        tag = self.get_object()
+        serializer = self.get_serializer(
+            tag,
+            data=request.data,
+            partial=kwargs.get('partial', False)
+        )
+        serializer.is_valid(raise_exception=True)
+
+        name = serializer.validated_data.get('name', tag.name)
+        version = serializer.validated_data.get('version', tag.version)
+        conflict = self.rename(request, {tag.pk: name}, {tag.pk: version})
+        if conflict is not None:
+            return conflict
+        tag.name, tag.version = name, version + 1
+
+        return Response(serializer.data)
+
+    def rename(self, request, names, versions):
+        """Renames tags of the user all at once, or none of them
+
+        Returns a 409 response listing current versions of the tags if
+        any was changed or deleted concurrently, otherwise None.
+        """
+
+        try:
+            with transaction.atomic():
+                if self.get_queryset().rename(names, versions) != len(names):
+                    raise _Rollback
+        except IntegrityError:
+            raise ValidationError(
+                {'name': [_('A tag with this name already exists.')]}
+            )
+        except _Rollback:
+            current = self.get_queryset().filter(
+                pk__in=list(names)).values('id', 'version')
+            return Response(
+                {
+                    'detail': _('Tags were changed or deleted concurrently.'),
+                    'tags': list(current),
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+
+        # UPDATE sends no post_save, so invalidate explicitly
+        cache.tags_changed(request.user.pk)
+
+        return None
+
+    @action(detail=False, methods=['post'], url_path='batch-rename')
+    def batch_rename(self, request):
+        """Renames many tags in a single UPDATE, all or none of them"""
+
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.TAG_BATCH_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+
+        names, versions = {}, {}
+        for item in serializer.validated_data:
+            names[item['id']] = item['name']
+            if 'version' in item:
+                versions[item['id']] = item['version']
+        if len(names) != len(serializer.validated_data):
+            raise ValidationError(_('Tag ids must be unique.'))
+
+        conflict = self.rename(request, names, versions)
+        if conflict is not None:
+            return conflict
+
+        return Response({'renamed': len(names)})
+
+    @action(detail=False, methods=['post'], url_path='batch-delete')
+    def batch_delete(self, request):
+        """Deletes many tags of the user in a single DELETE"""
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        deleted = self.get_queryset().filter(
+            pk__in=serializer.validated_data['ids']
+        ).delete_rows()
+        if deleted:
+            # A single DELETE sends no post_delete, so invalidate here
+            cache.tags_changed(request.user.pk)
+
+        return Response({'deleted': deleted})
+
+    @action(detail=False, methods=['get'], url_path='sync')
+    def sync(self, request):
+        """Lists tags changed and deleted since ?token= of last sync"""
+
+        return Response(sync.changes(
+            request.user,
+            request.query_params.get('token') or None
+        ))
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Creates many tags at once, skipping names that already exist"""
+
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            max_length=settings.TAG_BATCH_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+
+        # bulk_create sends no post_save, so invalidate explicitly
+        cache.tags_changed(request.user.pk)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Lists first tags whose name starts with ?q=, by name"""
+
+        return self.conditional_response(
+            request,
+            self.cached_response,
+            self.autocomplete_rows
+        )
+
+    def autocomplete_rows(self):
+        """Returns up to ?limit= tags matching the autocomplete prefix"""
+
+        term = filters.search_term(self.request)
+        if term is None:
+            return []
+
+        try:
+            limit = _positive_int(
+                self.request.query_params['limit'],
+                strict=True,
+                cutoff=self.autocomplete_max_limit
+            )
+        except (KeyError, ValueError):
+            limit = self.autocomplete_limit
+
+        return list(serializers.tag_rows(
+            filters.autocomplete(self.get_queryset(), term, limit)
+        ))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Streams all tags of the user as newline-delimited JSON"""
 
-    def perform_create(self, serializer):
-        """Create new tag"""
+        rows = self.get_queryset().values_list('id', 'name').iterator(
+            chunk_size=settings.TAG_EXPORT_CHUNK_SIZE
+        )
+        lines = (
+            json.dumps({'id': tag_id, 'name': name}) + '\n'
+            for tag_id, name in rows
+        )
 
-        serializer.save(user=self.request.user)
+        return StreamingHttpResponse(
+            lines,
+            content_type='application/x-ndjson'
+        )
@@ -0,0 +1,11 @@
+from core.async_views import cached_user, not_modified
+
+
+def me_fast_path(request):
+    """Answers unchanged profile with 304 without a DB round trip"""
+
+    user = cached_user(request)
+    if user is None:
+        return None
+
+    return not_modified(request, user)
@@ -5,6 +5,8 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core import throttling
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
@@ -17,8 +19,9 @@ def create_user(**params):
 class PublicUserApiTests(TestCase):
     """Tests the public users api"""
 
-    def setup(self):
+    def setUp(self):
         self.client = APIClient()
+        throttling.reset()
 
     def test_create_valid_user_success(self):
         """Tests creating user after submitting valid payload"""
@@ -170,3 +173,34 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password, payload['password'])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_profile_not_modified(self):
+        """Tests unchanged profile is answered with 304"""
+
+        etag = self.client.get(ME_URL)['ETag']
+
+        response = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_profile_modified(self):
+        """Tests updated profile invalidates the ETag"""
+
+        etag = self.client.get(ME_URL)['ETag']
+        self.client.patch(ME_URL, {'name': 'renamed'})
+
+        response = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'renamed')
+
+    def test_retrieve_profile_modified_elsewhere(self):
+        """Tests profile changes outside the API invalidate the ETag"""
+
+        etag = self.client.get(ME_URL)['ETag']
+        self.user.name = 'edited in admin'
+        self.user.save()
+
+        response = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
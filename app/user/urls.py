@@ -1,10 +1,24 @@
 from django.urls import path
+from core.async_views import deployment_view
 from user import views
+from user.async_views import me_fast_path
 
 app_name = 'user'
 
 urlpatterns = [
-    path('create/', views.CreateUserView.as_view(), name='create'),
-    path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('me/', views.ManageUserView.as_view(), name='me')
+    path(
+        'create/',
+        deployment_view(views.CreateUserView.as_view()),
+        name='create'
+    ),
+    path(
+        'token/',
+        deployment_view(views.CreateTokenView.as_view()),
+        name='token'
+    ),
+    path(
+        'me/',
+        deployment_view(views.ManageUserView.as_view(), me_fast_path),
+        name='me'
+    )
 ]
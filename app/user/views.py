@@ -1,6 +1,9 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.settings import api_settings
 
+from core.authentication import CachedTokenAuthentication
+from core.mixins import ConditionalGetMixin
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -8,22 +11,36 @@ class CreateUserView(generics.CreateAPIView):
     """Creates a new user in the system"""
 
     serializer_class = UserSerializer
+    throttle_scope = 'signup'
 
 
 class CreateTokenView(ObtainAuthToken):
     """Creates new auth token for user"""
 
     serializer_class = AuthTokenSerializer
+    # ObtainAuthToken disables throttling, restore the defaults
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    throttle_scope = 'login'
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """Manages authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """Retrieves and returns authenticated user"""
 
         return self.request.user
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieves user, answering an unchanged profile with 304"""
+
+        return self.conditional_response(
+            request,
+            super().retrieve,
+            *args,
+            **kwargs
+        )